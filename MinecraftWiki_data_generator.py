@@ -14,7 +14,7 @@ import zipfile
 from collections import defaultdict
 from tempfile import gettempdir
 
-from common import write_lines
+from common import fetch_asset_object, write_lines
 
 
 COMMENT_INFO = {
@@ -154,14 +154,11 @@ def translation_test(work_dir, output_dir, languages: list[str]=None, *, version
         assets = read_json(os.path.join(work_dir, 'assets.json'))
         assets = assets.get('objects', assets)
         def load_asset(name):
-            import json
-            import urllib.request
             try:
                 hash = assets[name.replace('\\', '/')]['hash']
             except KeyError:
                 return None
-            with urllib.request.urlopen(f'https://resources.download.minecraft.net/{hash[:2]}/{hash}') as f:
-                return json.loads(f.read())
+            return read_json(fetch_asset_object(f'https://resources.download.minecraft.net/{hash[:2]}/{hash}', hash))
         mcmeta = load_asset('pack.mcmeta')['language']
         for x in languages:
             languages_name[x] = lang_name(x, mcmeta)
@@ -4,12 +4,11 @@
 import argparse
 import os.path
 import pathlib
-import shutil
 from collections import OrderedDict
 
 from common import (
-    find_output, get_latest, hash_test, make_dirname, read_json,
-    read_manifest_json, run_animation, safe_del, urlretrieve,
+    DOWNLOAD_WORKERS, download_assets, find_output, get_latest, make_dirname, read_json,
+    read_manifest_json, replace_tree, run_animation, urlretrieve,
     valide_output, valide_version, work_done, write_json,
 )
 
@@ -23,12 +22,17 @@ parser.add_argument('-f', '--overwrite', help='Overwrite on the existing output
 
 parser.add_argument('-o', '--output', help='Output folder', type=pathlib.Path)
 parser.add_argument('--manifest-json', help='Local JSON manifest file of the target version.', type=pathlib.Path)
+parser.add_argument('--download-workers', help=f'Number of concurrent assets downloads. Default: {DOWNLOAD_WORKERS}', type=int, default=DOWNLOAD_WORKERS)
+parser.add_argument('--offline', help='Don\'t update the version manifest from the network, use the cached copies.', action='store_true')
+parser.add_argument('--reverify', help='Ignore the hash index and verify again the hash of all the files.', action='store_true')
 
 args = parser.parse_args()
 
 def main():
-    from common import update_version_manifest
+    from common import HASH_INDEX, HTTP_CACHE, update_version_manifest
     
+    HASH_INDEX.reverify = args.reverify
+    HTTP_CACHE.offline = args.offline
     update_version_manifest()
     
     print('--==| Minecraft: Assets Unindexer |==--')
@@ -74,6 +78,9 @@ def unindex_assets(args):
         return -1
     
     temp = os.path.join(gettempdir(), 'MC Assets data', version)
+    # temp is copied to the output at the end, its files don't need to stay indexed
+    from common import HASH_INDEX
+    HASH_INDEX.add_transient_root(temp)
     assets_json_path = os.path.join(temp, version+'.json')
     make_dirname(assets_json_path)
     
@@ -94,27 +101,29 @@ def unindex_assets(args):
     
     
     async def assets_dl():
-        for name,asset in assets_json['objects'].items():
-            file = os.path.join(temp, name)
-            
-            if not hash_test(asset['hash'], file):
-                safe_del(file)
-                make_dirname(file)
-                urlretrieve(asset['url'], file)
+        def progress(done, total):
+            run_animation.extra = f'{done}/{total}'
+        
+        download_assets(
+            [(asset['url'], os.path.join(temp, name), asset['hash']) for name,asset in assets_json['objects'].items()],
+            args.download_workers, progress,
+        )
         
     run_animation(assets_dl, 'Downloading assets')
     
     async def copy_assets_data():
-        if os.path.exists(output):
-            if args.overwrite:
-                safe_del(output)
-            else:
-                print(f'The output at "{output}" already exit and the overwrite is not enable')
-                return -1
+        if os.path.exists(output) and not args.overwrite:
+            print(f'The output at "{output}" already exit and the overwrite is not enable')
+            return -1
         
-        shutil.copytree(temp, output)
+        # the output is for the users, its files must not be hardlinks to the assets store
+        replace_tree(temp, output, link=False)
         
     run_animation(copy_assets_data, f'Move generated data to "{output}"')
+    
+    from common import HTTP_POOL
+    if HTTP_POOL.stats():
+        print(HTTP_POOL.summary())
 
 
 if __name__ == "__main__":
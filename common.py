@@ -5,10 +5,49 @@ import json
 import re
 import os.path
 
-from github import GitHub
+# The following module attributes are created at their first use, so importing common does no I/O:
+# GITHUB_DATA, GITHUB_BUILDER                                       _load_github()
+# CACHE_DIR, ASSETS_OBJECTS_DIR, HASH_INDEX, HTTP_CACHE             _load_cache()
+# VERSION_MANIFEST, VERSION_INDEX, LATEST_RELEASE, LATEST_SNAPSHOT  _load_version_manifest()
+# Inside common, call the loader before using them.
 
-GITHUB_DATA = GitHub('un-pogaz', 'MC-generated-data')
-GITHUB_BUILDER = GitHub('un-pogaz', 'MC-utility-tools')
+def _load_github():
+    global GITHUB_DATA, GITHUB_BUILDER
+    if 'GITHUB_DATA' in globals():
+        return
+    from github import GitHub
+    
+    GITHUB_DATA = GitHub('un-pogaz', 'MC-generated-data')
+    GITHUB_BUILDER = GitHub('un-pogaz', 'MC-utility-tools')
+
+def _load_cache():
+    global CACHE_DIR, ASSETS_OBJECTS_DIR, HASH_INDEX, HTTP_CACHE
+    if 'CACHE_DIR' in globals():
+        return
+    from tempfile import gettempdir
+    
+    CACHE_DIR = os.path.join(gettempdir(), 'MC_utility_tools')
+    ASSETS_OBJECTS_DIR = os.path.join(CACHE_DIR, 'assets', 'objects')
+    HASH_INDEX = HashIndex(os.path.join(CACHE_DIR, 'hash_index.json'))
+    HTTP_CACHE = HTTPCache(os.path.join(CACHE_DIR, 'http'))
+
+def __getattr__(name):
+    loader = {
+        'GITHUB_DATA': _load_github,
+        'GITHUB_BUILDER': _load_github,
+        'CACHE_DIR': _load_cache,
+        'ASSETS_OBJECTS_DIR': _load_cache,
+        'HASH_INDEX': _load_cache,
+        'HTTP_CACHE': _load_cache,
+        'VERSION_MANIFEST': _load_version_manifest,
+        'VERSION_INDEX': _load_version_manifest,
+        'LATEST_RELEASE': _load_version_manifest,
+        'LATEST_SNAPSHOT': _load_version_manifest,
+    }.get(name)
+    if not loader:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    loader()
+    return globals()[name]
 
 
 def run_animation(awaitable, text_wait, text_end=None):
@@ -35,8 +74,11 @@ def run_animation(awaitable, text_wait, text_end=None):
     animation_run = True
     t = Thread(target=start_animation)
     t.start()
-    asyncio.run(awaitable())
+    with STAGE_STATS.stage(text_wait):
+        asyncio.run(awaitable())
     animation_run = False
+    if callable(text_end):
+        text_end = text_end()
     msg = ' '.join([text_wait, text_end or '> OK'])
     print(msg+' '*(len(msg_last)-len(msg)+1))
     time.sleep(0.2)
@@ -44,6 +86,80 @@ def run_animation(awaitable, text_wait, text_end=None):
 run_animation.extra = ''
 run_animation.loop = ['|','/','—','\\']
 
+class StageStats():
+    """
+    Instrumentation of the stages run by run_animation(): wall time, CPU time (with the child processes),
+    bytes downloaded, bytes and files written. Also the timings of the listing functions.
+    With profile set to a folder, the cProfile stats of each stage are dumped in it.
+    """
+    
+    def __init__(self):
+        self.profile = None
+        self.reset()
+    
+    def reset(self):
+        self.stages = []
+        self.listings = {}
+    
+    @staticmethod
+    def _counters() -> dict[str, float]:
+        import time
+        
+        times = os.times()
+        return {
+            'wall_time': time.perf_counter(),
+            'cpu_time': time.process_time() + times.children_user + times.children_system,
+            'bytes_downloaded': HTTP_POOL.bytes_received(),
+            'bytes_written': WRITE_STATS.bytes,
+            'files_written': WRITE_STATS.written + WRITE_STATS.skipped,
+        }
+    
+    def stage(self, name):
+        """Context manager that measure a stage."""
+        from contextlib import contextmanager
+        
+        @contextmanager
+        def measure():
+            profiler = None
+            if self.profile:
+                import cProfile
+                profiler = cProfile.Profile()
+            start = self._counters()
+            if profiler:
+                profiler.enable()
+            try:
+                yield
+            finally:
+                if profiler:
+                    profiler.disable()
+                    slug = re.sub(r'\W+', '_', name).strip('_')[:60]
+                    file = os.path.join(self.profile, f'{len(self.stages):02}-{slug}.prof')
+                    make_dirname(file)
+                    profiler.dump_stats(file)
+                end = self._counters()
+                stage = {'name': name}
+                stage.update({k:round(end[k] - v, 6) for k,v in start.items()})
+                self.stages.append(stage)
+        
+        return measure()
+    
+    def listing(self, name, wall_time, cpu_time, files):
+        self.listings[name] = {'wall_time': round(wall_time, 6), 'cpu_time': round(cpu_time, 6), 'files_written': files}
+    
+    def report(self) -> dict:
+        return {
+            'stages': self.stages,
+            'listings': dict(sorted(self.listings.items())),
+        }
+    
+    def write(self, path):
+        """Write the timing report as JSON."""
+        make_dirname(path)
+        with open(path, 'wt', newline='\n', encoding='utf-8') as f:
+            f.write(json.dumps(self.report(), indent=2))
+
+STAGE_STATS = StageStats()
+
 def run_command(command_line, wait=True):
     """
     Lauch a command line and return the subprocess
@@ -71,6 +187,189 @@ def make_dirname(path):
     if dir:
         os.makedirs(dir, exist_ok=True)
 
+_WRITES_RECORDERS: list[set[str]] = []
+
+def _record_write(path):
+    for recorder in _WRITES_RECORDERS:
+        recorder.add(path)
+
+def _break_hardlink(path):
+    try:
+        # never write through a hardlink, the other links must keep their content
+        if os.stat(path).st_nlink > 1:
+            os.unlink(path)
+    except OSError:
+        pass
+
+def _prepare_write(path):
+    make_dirname(path)
+    _record_write(path)
+    _break_hardlink(path)
+
+class WriteStats():
+    """
+    Count of the files written by write_json(), write_text() and write_lines().
+    With compare, the files that already have the same content are not written again.
+    """
+    
+    def __init__(self):
+        import threading
+        
+        self.compare = False
+        self.written = 0
+        self.skipped = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+    
+    def add(self, written=0, skipped=0, bytes=0):
+        with self._lock:
+            self.written += written
+            self.skipped += skipped
+            self.bytes += bytes
+    
+    def summary(self) -> str:
+        return f'{self.written} files written, {self.skipped} unchanged'
+
+WRITE_STATS = WriteStats()
+
+def _same_content(path, data: bytes) -> bool:
+    import hashlib
+    
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    if st.st_size != len(data):
+        return False
+    
+    _load_cache()
+    digest = HASH_INDEX.lookup(path, st)
+    if not digest:
+        digest = hash_file(path)
+        HASH_INDEX.record(path, digest, st)
+    return digest == hashlib.sha1(data).hexdigest()
+
+def _written(path, data: bytes):
+    if WRITE_STATS.compare:
+        import hashlib
+        _load_cache()
+        HASH_INDEX.record(path, hashlib.sha1(data).hexdigest())
+    WRITE_STATS.add(written=1, bytes=len(data))
+
+_OUTPUT_SINKS: list['OutputSink'] = []
+
+def _write_output(path, text: str):
+    data = text.encode('utf-8')
+    if _OUTPUT_SINKS:
+        _OUTPUT_SINKS[-1].write(path, data)
+        return
+    
+    if WRITE_STATS.compare and _same_content(path, data):
+        _record_write(path)
+        WRITE_STATS.add(skipped=1)
+        return
+    _prepare_write(path)
+    with open(path, 'wb') as f:
+        f.write(data)
+    _written(path, data)
+
+class OutputSink():
+    """
+    Context manager that buffer the files written by write_json(), write_text() and write_lines().
+    The folders are created once, and the files are written by a pool of threads.
+    The files are all written when the context is exited, or by flush().
+    """
+    
+    def __init__(self, workers=4, max_pending=256):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._dirs = set()
+        self._pending = {}
+        self._executor = None
+    
+    def __enter__(self):
+        if self.workers > 0:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        _OUTPUT_SINKS.append(self)
+        return self
+    
+    def __exit__(self, *exc):
+        _OUTPUT_SINKS[:] = [s for s in _OUTPUT_SINKS if s is not self]
+        try:
+            self.flush()
+        finally:
+            if self._executor:
+                self._executor.shutdown()
+                self._executor = None
+    
+    def _makedirs(self, dir):
+        if dir and dir not in self._dirs:
+            os.makedirs(dir, exist_ok=True)
+            self._dirs.add(dir)
+    
+    def _write_file(self, path, data: bytes):
+        if WRITE_STATS.compare and _same_content(path, data):
+            WRITE_STATS.add(skipped=1)
+            return
+        
+        dir = os.path.dirname(path)
+        self._makedirs(dir)
+        _break_hardlink(path)
+        try:
+            f = open(path, 'wb')
+        except FileNotFoundError:
+            # the folder has been removed since
+            self._dirs.discard(dir)
+            self._makedirs(dir)
+            f = open(path, 'wb')
+        with f:
+            f.write(data)
+        _written(path, data)
+    
+    def write(self, path, data: bytes):
+        _record_write(path)
+        if not self._executor:
+            self._write_file(path, data)
+            return
+        
+        # the writes on a same file must stay in order
+        previous = self._pending.pop(path, None)
+        if previous:
+            previous.result()
+        if len(self._pending) >= self.max_pending:
+            self.flush()
+        self._pending[path] = self._executor.submit(self._write_file, path, data)
+    
+    def flush(self):
+        pending = list(self._pending.values())
+        self._pending.clear()
+        for future in pending:
+            future.result()
+
+def flush_output():
+    """Write all the files buffered by the OutputSink in use."""
+    for sink in _OUTPUT_SINKS:
+        sink.flush()
+
+def record_writes():
+    """
+    Context manager that collect the paths of the files
+    written by write_json(), write_text() and write_lines().
+    """
+    from contextlib import contextmanager
+    
+    @contextmanager
+    def recorder():
+        written = set()
+        _WRITES_RECORDERS.append(written)
+        try:
+            yield written
+        finally:
+            # remove by identity, two recorders can be equals
+            _WRITES_RECORDERS[:] = [r for r in _WRITES_RECORDERS if r is not written]
+    return recorder()
+
 def read_json(path, default=None):
     try:
         with open(path, 'rb') as f:
@@ -79,33 +378,110 @@ def read_json(path, default=None):
         return default or {}
 
 def write_json(path, obj, sort_keys: bool=False):
-    make_dirname(path)
+    _write_output(path, json.dumps(obj, indent=2, ensure_ascii=False, sort_keys=sort_keys))
+
+def iter_json_object(path, chunk_size=1024*1024):
+    """
+    Iterate over the (key, value) of the top-level object of a JSON file,
+    without loading all the file: only one value at a time is parsed.
+    """
+    decoder = json.JSONDecoder()
+    
+    with open(path, 'rt', encoding='utf-8') as f:
+        buf = ''
+        pos = 0
+        eof = False
+        
+        def more(size=chunk_size):
+            nonlocal buf, pos, eof
+            data = f.read(size)
+            if not data:
+                eof = True
+            buf = buf[pos:] + data
+            pos = 0
+        
+        def skip_ws():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos].isspace():
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                more()
+        
+        def expect(char):
+            nonlocal pos
+            skip_ws()
+            if buf[pos:pos+1] != char:
+                raise json.JSONDecodeError(f'Expecting {char!r}', buf, pos)
+            pos += 1
+        
+        def decode():
+            nonlocal pos
+            skip_ws()
+            size = chunk_size
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                    # a number at the end of the buffer can be truncated
+                    if eof or (end < len(buf) and buf[end] in ' \t\r\n,:}'):
+                        pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                # read bigger chunks for the big values
+                more(size)
+                size *= 2
+        
+        expect('{')
+        skip_ws()
+        if buf[pos:pos+1] == '}':
+            return
+        while True:
+            key = decode()
+            expect(':')
+            yield key, decode()
+            skip_ws()
+            if buf[pos:pos+1] == '}':
+                return
+            expect(',')
+
+def write_json_object(path, items):
+    """
+    Write the (key, value) of items as a JSON object, one value at a time.
+    The output is identical to write_json() on the equivalent dict.
+    """
+    _prepare_write(path)
     with open(path, 'wt', newline='\n', encoding='utf-8') as f:
-        f.write(json.dumps(obj, indent=2, ensure_ascii=False, sort_keys=sort_keys))
+        empty = True
+        for key, value in items:
+            f.write(('{\n' if empty else ',\n') + '  ' + json.dumps(key, ensure_ascii=False) + ': ')
+            f.write(json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+            empty = False
+        f.write('{}' if empty else '\n}')
+
+def peek_text(path, size=64*1024):
+    """The first characters of a text file."""
+    with open(path, 'rt', encoding='utf-8') as f:
+        return f.read(size)
 
 def read_text(path):
     with open(path, 'rt', encoding='utf-8') as f:
         return ''.join(f.readlines())
 
 def write_text(path, text):
-    make_dirname(path)
-    with open(path, 'wt', newline='\n', encoding='utf-8') as f:
-        f.write(text)
+    _write_output(path, text)
 
 def read_lines(path):
     return [x for x in read_text(path).splitlines(False)]
 
 def write_lines(path, lines, newline_end=True):
-    make_dirname(path)
-    with open(path, 'wt', newline='\n', encoding='utf-8') as f:
-        if len(lines) == 0:
-            f.write('')
-        else:
-            n = '\n'
-            s = n.join(lines)
-            f.write(s)
-            if newline_end and s and s[-1] != n:
-                f.write(n)
+    n = '\n'
+    s = n.join(lines)
+    if newline_end and s and s[-1] != n:
+        s += n
+    _write_output(path, s)
 
 
 def safe_del(path):
@@ -127,6 +503,199 @@ def safe_del(path):
     except Exception:
         pass
 
+def extract_zip(zip, targets, workers=1):
+    """
+    Extract in one pass a list of entries of a ZipFile.
+    All the target paths are planned first, so each folder is created only once.
+    
+    :type zip:          zipfile.ZipFile
+    :param zip:         ZipFile opened in read mode
+    :type targets:      list[tuple[zipfile.ZipInfo, str]]
+    :param targets:     (entry, destination folder) to extract
+    :type workers:      int
+    :param workers:     Number of threads used to decompress the entries
+    :rtype:             tuple[int, int]
+    :return:            Number of extracted files and total uncompressed size
+    """
+    import shutil
+    
+    def target_path(info, dest):
+        # same sanitization as ZipFile.extract()
+        arcname = info.filename.replace('/', os.path.sep)
+        if os.path.altsep:
+            arcname = arcname.replace(os.path.altsep, os.path.sep)
+        arcname = os.path.splitdrive(arcname)[1]
+        arcname = os.path.sep.join(x for x in arcname.split(os.path.sep) if x not in ('', os.path.curdir, os.path.pardir))
+        return os.path.join(dest, arcname)
+    
+    files = []
+    dirs = set()
+    for info, dest in targets:
+        path = target_path(info, dest)
+        if info.is_dir():
+            dirs.add(path)
+        else:
+            dirs.add(os.path.dirname(path))
+            files.append((info, path))
+    
+    for d in sorted(dirs):
+        os.makedirs(d, exist_ok=True)
+    
+    def extract(info, path):
+        try:
+            # unlink first, the previous file can be a hardlink
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            safe_del(path)
+        with zip.open(info) as src, open(path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024*1024)
+        return info.file_size
+    
+    if workers and workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            size = sum(executor.map(lambda x: extract(*x), files))
+    else:
+        size = sum(extract(*x) for x in files)
+    
+    return len(files), size
+
+def format_throughput(count, size, seconds):
+    seconds = max(seconds, 1e-9)
+    return '{:.1f} MB/s, {:.0f} entries/s'.format(size/seconds/1024/1024, count/seconds)
+
+ZIP_METHODS = ('deflate', 'store', 'bzip2', 'lzma')
+# range of the compression level of each method, None if the method has no level
+ZIP_LEVELS = {'deflate': (0, 9), 'store': None, 'bzip2': (1, 9), 'lzma': (0, 9)}
+ZIP_STORED_EXTENSIONS = ('.png', '.ogg')
+
+def check_zip_level(method, level):
+    """
+    Raise ValueError if level is not a valid compression level of method.
+    """
+    if level is None:
+        return
+    levels = ZIP_LEVELS[method]
+    if levels is None:
+        raise ValueError(f'The zip method {method} has no compression level.')
+    if not levels[0] <= level <= levels[1]:
+        raise ValueError(f'The compression level of the zip method {method} must be between {levels[0]} and {levels[1]}, not {level}.')
+
+def make_zip(path, root_dir, method='deflate', level=None, workers=None, date_time=(1980, 1, 1, 0, 0, 0)):
+    """
+    Create a reproducible zip of the content of root_dir:
+    the entries are sorted and have fixed timestamps and permissions.
+    The entries are compressed in parallel, then written in order.
+    The already compressed files (ZIP_STORED_EXTENSIONS) are stored as they are.
+    
+    :type path:         str
+    :param path:        Zip file to create
+    :type root_dir:     str
+    :param root_dir:    Folder to empack
+    :type method:       str
+    :param method:      Compression method, one of ZIP_METHODS
+    :type level:        int
+    :param level:       Compression level in the range ZIP_LEVELS of the method, None for the default of the method
+    :type workers:      int
+    :param workers:     Number of threads used to compress the entries. Default: number of CPU
+    :rtype:             tuple[int, int]
+    :return:            Number of files and total uncompressed size
+    """
+    import zipfile
+    import zlib
+    from concurrent.futures import ThreadPoolExecutor
+    
+    check_zip_level(method, level)
+    compress_type = {
+        'deflate': zipfile.ZIP_DEFLATED,
+        'store': zipfile.ZIP_STORED,
+        'bzip2': zipfile.ZIP_BZIP2,
+        'lzma': zipfile.ZIP_LZMA,
+    }[method]
+    
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames.sort()
+        rel = os.path.relpath(dirpath, root_dir)
+        rel = '' if rel == os.curdir else rel.replace(os.path.sep, '/')+'/'
+        if rel:
+            entries.append((rel, None))
+        for f in sorted(filenames):
+            entries.append((rel+f, os.path.join(dirpath, f)))
+    
+    def compress(arcname, file):
+        zinfo = zipfile.ZipInfo(arcname, date_time)
+        zinfo.create_system = 3
+        if file is None:
+            zinfo.external_attr = (0o40755 << 16) | 0x10
+            zinfo.CRC = zinfo.compress_size = zinfo.file_size = 0
+            return zinfo, b''
+        
+        zinfo.external_attr = 0o644 << 16
+        with open(file, 'rb') as f:
+            data = f.read()
+        zinfo.file_size = len(data)
+        zinfo.CRC = zlib.crc32(data)
+        
+        zinfo.compress_type = compress_type
+        if os.path.splitext(file)[1].lower() in ZIP_STORED_EXTENSIONS:
+            zinfo.compress_type = zipfile.ZIP_STORED
+        match zinfo.compress_type:
+            case zipfile.ZIP_DEFLATED:
+                c = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION if level is None else level, zlib.DEFLATED, -15)
+                data = c.compress(data) + c.flush()
+            case zipfile.ZIP_BZIP2:
+                import bz2
+                data = bz2.compress(data, 9 if level is None else level)
+            case zipfile.ZIP_LZMA:
+                import lzma
+                # the .lzma format start with the 5 bytes of the LZMA properties and the 8 bytes of the size,
+                # a zip entry start with the LZMA version (9.4) and the size of the properties
+                data = lzma.compress(data, lzma.FORMAT_ALONE, preset=6 if level is None else level)
+                data = b'\x09\x04\x05\x00' + data[:5] + data[13:]
+                # end-of-stream marker
+                zinfo.flag_bits |= 0x02
+        zinfo.compress_size = len(data)
+        return zinfo, data
+    
+    tmp = path+'.tmp'
+    safe_del(tmp)
+    make_dirname(path)
+    count = size = 0
+    with zipfile.ZipFile(tmp, mode='w') as zip, ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        window = (workers or os.cpu_count() or 1) * 4
+        pending = []
+        
+        def write_next():
+            nonlocal count, size
+            zinfo, data = pending.pop(0).result()
+            # the data is already compressed: write the header and the data like ZipFile.open('w'),
+            # the central directory is written by ZipFile.close()
+            zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+            zinfo.header_offset = zip.fp.tell()
+            zip.fp.write(zinfo.FileHeader(zip64))
+            zip.fp.write(data)
+            zip.start_dir = zip.fp.tell()
+            zip.filelist.append(zinfo)
+            zip.NameToInfo[zinfo.filename] = zinfo
+            zip._didModify = True
+            if not zinfo.is_dir():
+                count += 1
+                size += zinfo.file_size
+        
+        # bounded number of compressed entries in memory
+        for arcname, file in entries:
+            pending.append(executor.submit(compress, arcname, file))
+            if len(pending) >= window:
+                write_next()
+        while pending:
+            write_next()
+    
+    os.replace(tmp, path)
+    return count, size
+
 def remove_empty(path):
     """
     recursive remove empty folder
@@ -138,6 +707,20 @@ def remove_empty(path):
             os.rmdir(p)
 
 
+def crc_file(file):
+    import zlib
+    crc = 0
+    with open(file, 'rb') as f:
+        while chunk := f.read(1024*1024):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+def zip_crc_index(path) -> dict[str, tuple[int, int]]:
+    """(CRC, size) of each file of a zip, read from the central directory only"""
+    import zipfile
+    with zipfile.ZipFile(path, mode='r') as zip:
+        return {i.filename:(i.CRC, i.file_size) for i in zip.infolist() if not i.is_dir()}
+
 def hash_file(file):
     if os.path.exists(file):
         import hashlib
@@ -146,33 +729,760 @@ def hash_file(file):
         return hash.hexdigest()
     return None
 
+class HashIndex():
+    """
+    Persistent index of the verified hash of the files,
+    keyed by (path, size, mtime_ns, inode), to trust the unchanged files without reading them.
+    The files under a transient root (a work folder moved away or deleted at the end) are only indexed
+    for the current process, and the entries of the files that don't exist anymore are dropped on save.
+    """
+    
+    def __init__(self, path):
+        import threading
+        
+        self.path = path
+        self.reverify = False
+        self._data = None
+        self._changes = {}
+        self._transient_roots = []
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(file):
+        return os.path.normcase(os.path.abspath(file))
+    
+    def add_transient_root(self, root):
+        root = os.path.join(self._key(root), '')
+        with self._lock:
+            if root not in self._transient_roots:
+                self._transient_roots.append(root)
+    
+    def _transient(self, key):
+        return any(key.startswith(r) for r in self._transient_roots)
+    
+    @staticmethod
+    def _stat_key(st):
+        return [st.st_size, st.st_mtime_ns, st.st_ino]
+    
+    def _load(self):
+        if self._data is None:
+            import atexit
+            self._data = read_json(self.path)
+            atexit.register(self.save)
+        return self._data
+    
+    def lookup(self, file, st=None):
+        if self.reverify:
+            return None
+        try:
+            st = st or os.stat(file)
+        except OSError:
+            return None
+        entry = self._load().get(self._key(file))
+        if entry and entry[:3] == self._stat_key(st):
+            return entry[3]
+        return None
+    
+    def record(self, file, hash, st=None):
+        try:
+            st = st or os.stat(file)
+        except OSError:
+            return
+        entry = self._stat_key(st) + [hash]
+        with self._lock:
+            key = self._key(file)
+            self._load()[key] = entry
+            if not self._transient(key):
+                self._changes[key] = entry
+    
+    def save(self):
+        with self._lock:
+            if not self._changes:
+                return
+            # merge with the index written by the others processes in the meantime
+            data = read_json(self.path)
+            data.update(self._changes)
+            data = {k:v for k,v in data.items() if not self._transient(k) and os.path.exists(k)}
+            tmp = f'{self.path}.{os.getpid()}.tmp'
+            make_dirname(tmp)
+            with open(tmp, 'wt', newline='\n', encoding='utf-8') as f:
+                f.write(json.dumps(data, indent=None, separators=(',', ':')))
+            os.replace(tmp, self.path)
+            self._changes.clear()
+
+def hash_file_indexed(file):
+    """
+    Same as hash_file(), but trust the hash index for the unchanged files.
+    """
+    try:
+        st = os.stat(file)
+    except OSError:
+        return None
+    
+    _load_cache()
+    file_hash = HASH_INDEX.lookup(file, st)
+    if not file_hash:
+        file_hash = hash_file(file)
+        HASH_INDEX.record(file, file_hash, st)
+    return file_hash
+
 def hash_test(hash, file):
-    if hash and os.path.exists(file):
-        return hash == hash_file(file)
-    return False
+    if not hash:
+        return False
+    return hash == hash_file_indexed(file)
+
 
+class HTTPPool():
+    """
+    Pool of keep-alive HTTP connections, by host.
+    At most max_per_host connections to the same host are used at the same time,
+    the other requests wait for a connection to be released.
+    The redirections are followed, and any other status than 2xx raise urllib.error.HTTPError.
+    The proxies of the environment (HTTP_PROXY, HTTPS_PROXY, NO_PROXY) are used as urllib do:
+    a https url is tunneled with CONNECT, a http url is requested to the proxy.
+    """
+    
+    def __init__(self, max_per_host=8, timeout=60):
+        import threading
+        
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle: dict[tuple, list] = {}
+        self._slots: dict[tuple, threading.BoundedSemaphore] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+    
+    def _count(self, host, key, n=1):
+        with self._lock:
+            stats = self._stats.setdefault(host, {'connections': 0, 'requests': 0, 'reused': 0, 'bytes': 0})
+            stats[key] += n
+    
+    def _slot(self, key):
+        import threading
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return self._slots[key]
+    
+    @staticmethod
+    def _proxy(scheme, host) -> tuple[str, int, dict[str, str]]|None:
+        """
+        The (host, port, headers) of the proxy to use for host, None for a direct connection.
+        """
+        import base64
+        from urllib import request
+        from urllib.parse import unquote, urlsplit
+        
+        proxy = request.getproxies().get(scheme)
+        if not proxy or request.proxy_bypass(host):
+            return None
+        if '://' not in proxy:
+            proxy = 'http://' + proxy
+        split = urlsplit(proxy)
+        headers = {}
+        if split.username:
+            credentials = unquote(split.username) +':'+ unquote(split.password or '')
+            headers['Proxy-Authorization'] = 'Basic ' + base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+        return split.hostname, split.port or 80, headers
+    
+    def _connection(self, key, proxy):
+        import http.client
+        
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        self._count(host, 'connections')
+        if not proxy:
+            return cls(host, port, timeout=self.timeout), False
+        
+        proxy_host, proxy_port, proxy_headers = proxy
+        conn = cls(proxy_host, proxy_port, timeout=self.timeout)
+        if scheme == 'https':
+            conn.set_tunnel(host, port, headers=proxy_headers)
+        return conn, False
+    
+    def _release(self, key, conn, reusable):
+        if reusable:
+            with self._lock:
+                self._idle.setdefault(key, []).append(conn)
+        else:
+            conn.close()
+        self._slot(key).release()
+    
+    def request(self, url, headers=None, max_redirects=10) -> 'PooledResponse':
+        """
+        GET url. The returned response must be closed (or used as a context manager) to release its connection.
+        """
+        import http.client
+        import io
+        from urllib import error
+        from urllib.parse import urljoin, urlsplit
+        
+        headers = dict(headers or {})
+        for _ in range(max_redirects+1):
+            split = urlsplit(url)
+            scheme = split.scheme.lower()
+            key = (scheme, split.hostname, split.port or (443 if scheme == 'https' else 80))
+            path = split.path or '/'
+            if split.query:
+                path += '?' + split.query
+            request_headers = headers
+            proxy = self._proxy(scheme, split.hostname)
+            if proxy and scheme == 'http':
+                # no tunnel, the proxy get the full url
+                path = split._replace(fragment='').geturl()
+                request_headers = headers | proxy[2]
+            
+            self._slot(key).acquire()
+            try:
+                while True:
+                    conn, reused = self._connection(key, proxy)
+                    try:
+                        conn.request('GET', path, headers=request_headers)
+                        response = conn.getresponse()
+                        break
+                    except (OSError, http.client.HTTPException) as e:
+                        conn.close()
+                        # the server can close an idle connection at any time
+                        if not reused:
+                            if isinstance(e, OSError):
+                                raise
+                            raise error.URLError(e) from e
+            except BaseException:
+                self._slot(key).release()
+                raise
+            
+            self._count(key[1], 'requests')
+            if reused:
+                self._count(key[1], 'reused')
+            rslt = PooledResponse(self, key, conn, response, url)
+            
+            if response.status in (301, 302, 303, 307, 308) and response.headers.get('Location'):
+                rslt.read()
+                rslt.close()
+                url = urljoin(url, response.headers['Location'])
+                continue
+            if not 200 <= response.status < 300:
+                body = rslt.read()
+                rslt.close()
+                raise error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+            return rslt
+        
+        raise error.URLError(f'Too many redirections for {url}')
+    
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        By host, the number of connections opened, requests sent, requests sent on a reused connection,
+        and bytes received.
+        """
+        with self._lock:
+            return {k:dict(v) for k,v in self._stats.items()}
+    
+    def bytes_received(self) -> int:
+        with self._lock:
+            return sum(s['bytes'] for s in self._stats.values())
+    
+    def summary(self) -> str:
+        return ', '.join(f"{host}: {s['requests']} requests on {s['connections']} connections" for host,s in sorted(self.stats().items()))
+    
+    def close(self):
+        with self._lock:
+            idle = [c for l in self._idle.values() for c in l]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+class PooledResponse():
+    """
+    Response of HTTPPool.request(), its connection go back to the pool when it is closed.
+    """
+    
+    def __init__(self, pool: HTTPPool, key, conn, response, url):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self.url = url
+        self.status = response.status
+        self.headers = response.headers
+    
+    def read(self, amt=None) -> bytes:
+        data = self._response.read(amt)
+        self._pool._count(self._key[1], 'bytes', len(data))
+        return data
+    
+    def readinto(self, b) -> int:
+        n = self._response.readinto(b)
+        self._pool._count(self._key[1], 'bytes', n)
+        return n
+    
+    def close(self):
+        if self._conn is None:
+            return
+        response = self._response
+        # the connection can be reused only if the body has been read to the end
+        reusable = response.isclosed() and not response.will_close
+        if not reusable:
+            response.close()
+        self._pool._release(self._key, self._conn, reusable)
+        self._conn = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+HTTP_POOL = HTTPPool()
 
 def urlretrieve(url, filename, reporthook=None, data=None):
-    from urllib import request
+    import shutil
     
     url = url.replace('http://', 'https://')
-    return request.urlretrieve(url, filename, reporthook, data)
-
-def urlopen(url) :
-    from urllib import request
+    make_dirname(filename)
+    _break_hardlink(filename)
+    if data is not None:
+        # a POST is not a request of the pool
+        from urllib import request
+        return request.urlretrieve(url, filename, reporthook, data)
     
+    with HTTP_POOL.request(url) as response, open(filename, 'wb') as f:
+        if reporthook:
+            total = int(response.headers.get('Content-Length') or -1)
+            block = 0
+            reporthook(block, 2**16, total)
+            while chunk := response.read(2**16):
+                f.write(chunk)
+                block += 1
+                reporthook(block, 2**16, total)
+        else:
+            shutil.copyfileobj(response, f, 2**20)
+        return filename, response.headers
+
+def urlopen(url, headers=None) -> PooledResponse:
     url = url.replace('http://', 'https://')
-    return request.urlopen(url, )
+    return HTTP_POOL.request(url, headers)
+
+class HTTPCache():
+    """
+    Cache on disk of HTTP responses with their ETag/Last-Modified.
+    A response younger than ttl (in seconds) is used as it is,
+    an older one is revalidated by a conditional GET.
+    In offline mode, only the cached responses are used.
+    """
+    
+    def __init__(self, path, ttl=600, offline=False):
+        self.path = path
+        self.ttl = ttl
+        self.offline = offline
+    
+    def _files(self, url) -> tuple[str, str]:
+        import hashlib
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, key), os.path.join(self.path, key+'.json')
+    
+    def _store(self, file, data: bytes):
+        tmp = f'{file}.{os.getpid()}.tmp'
+        make_dirname(tmp)
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, file)
+    
+    def get(self, url) -> bytes:
+        """
+        The content at url. The url is used as it is, so a local server can stand in for the real one.
+        Raise OSError if the content is not available (and not in cache).
+        """
+        import time
+        from urllib import error
+        
+        body_file, meta_file = self._files(url)
+        meta = read_json(meta_file) if os.path.exists(body_file) else {}
+        
+        def cached():
+            with open(body_file, 'rb') as f:
+                return f.read()
+        
+        if meta and (self.offline or time.time() - meta.get('time', 0) < self.ttl):
+            return cached()
+        if self.offline:
+            raise OSError(f'{url} is not in the cache, and the offline mode is enabled.')
+        
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        
+        try:
+            with HTTP_POOL.request(url, headers) as response:
+                data = response.read()
+                meta = {
+                    'url': url,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                }
+            self._store(body_file, data)
+        except error.HTTPError as e:
+            if e.code != 304 or not meta:
+                raise
+            data = cached()
+        except OSError:
+            # no network: the outdated response is better than nothing
+            if not meta:
+                raise
+            return cached()
+        
+        meta['time'] = time.time()
+        self._store(meta_file, json.dumps(meta).encode('utf-8'))
+        return data
+    
+    def get_json(self, url):
+        return json.loads(self.get(url))
+
+DOWNLOAD_CHUNK_SIZE = 2**20
+
+def download_file(url, file, sha1=None, retries=5, chunk_size=DOWNLOAD_CHUNK_SIZE, progress=None, part=None):
+    """
+    Download url to file through a '.part' file, renamed on success.
+    A '.part' left by a previous attempt is resumed with a Range request,
+    and a dropped connection is resumed the same way, up to retries times.
+    The SHA-1 is computed while the data is written, a mismatch delete the '.part' and raise OSError.
+    The verified SHA-1 is recorded in the hash index, so the file is not read again to be tested.
+    The url is used as it is, so a local server can stand in for the real one.
+
+    :type sha1:         str
+    :param sha1:        Expected SHA-1 of the file, not checked if None
+    :type progress:     Callable[[int, int|None], None]
+    :param progress:    Called with (received, total) after each chunk
+    :type part:         str
+    :param part:        Path of the partial file, file+'.part' by default
+    """
+    import hashlib
+    import http.client
+    from urllib import error
+
+    part = part or file + '.part'
+    make_dirname(part)
+    hasher = hashlib.sha1()
+    offset = 0
+    if os.path.exists(part):
+        with open(part, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                hasher.update(chunk)
+                offset += len(chunk)
+
+    total = None
+    attempt = 0
+    while True:
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+        try:
+            with HTTP_POOL.request(url, headers) as response:
+                if response.status == 206:
+                    m = re.match(r'bytes (\d+)-\d+/(\d+|\*)', response.headers.get('Content-Range', ''))
+                    if not m or int(m.group(1)) != offset:
+                        # not the requested range: the attempt failed, the next one restart from 0 without Range
+                        hasher = hashlib.sha1()
+                        offset = 0
+                        raise http.client.HTTPException(f'Unexpected Content-Range for {url}: {response.headers.get("Content-Range")!r}')
+                    if m.group(2) != '*':
+                        total = int(m.group(2))
+                else:
+                    # the range is ignored, the full file is sent again
+                    hasher = hashlib.sha1()
+                    offset = 0
+                    total = int(response.headers['Content-Length']) if response.headers.get('Content-Length') else None
+
+                with open(part, 'r+b' if offset else 'wb') as f:
+                    f.seek(offset)
+                    f.truncate()
+                    while chunk := response.read(chunk_size):
+                        f.write(chunk)
+                        hasher.update(chunk)
+                        offset += len(chunk)
+                        if progress:
+                            progress(offset, total)
+            if total is not None and offset < total:
+                raise http.client.IncompleteRead(b'', total - offset)
+            break
+        except error.HTTPError as e:
+            if e.code != 416 or not offset:
+                raise
+            # the '.part' already has all the data
+            break
+        except (OSError, http.client.HTTPException):
+            attempt += 1
+            if attempt > retries:
+                raise
+
+    if sha1 and hasher.hexdigest() != sha1:
+        safe_del(part)
+        raise OSError(f'The download of {url} is corrupted: SHA-1 {hasher.hexdigest()} instead of {sha1}.')
+    os.replace(part, file)
+    _load_cache()
+    HASH_INDEX.record(file, hasher.hexdigest())
+    return hasher.hexdigest()
+
+def asset_object_path(hash):
+    # same layout as the objects folder of the launcher
+    _load_cache()
+    return os.path.join(ASSETS_OBJECTS_DIR, hash[0:2], hash)
+
+def fetch_asset_object(url, hash):
+    """
+    Return the path of the object in the shared assets store,
+    downloading it only if it isn't already present.
+    """
+    import threading
+    
+    obj = asset_object_path(hash)
+    if not hash_test(hash, obj):
+        # unique temp name, the same object can be requested by several threads
+        tmp = f'{obj}.{os.getpid()}-{threading.get_ident()}.tmp'
+        try:
+            download_file(url.replace('http://', 'https://'), obj, hash, part=tmp)
+        finally:
+            safe_del(tmp)
+    return obj
+
+def copy_file(src, dst):
+    """
+    Copy a file, using copy_file_range() when available,
+    so the file system can reflink the data instead of duplicate it.
+    """
+    import shutil
+    
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 2**30):
+                    pass
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+
+def materialize_file(src, dst):
+    """
+    Place the file src at dst by hardlink,
+    or by reflink/copy if the hardlink is imposible.
+    """
+    safe_del(dst)
+    make_dirname(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        copy_file(src, dst)
+
+def _unshare_file(file):
+    # replace a file hardlinked elsewhere by its own copy
+    if os.stat(file).st_nlink > 1:
+        tmp = file +'.'+ str(os.getpid()) +'.tmp'
+        copy_file(file, tmp)
+        os.replace(tmp, file)
+
+def materialize_tree(src, dst, move=False, link=True):
+    """
+    Place the folder src at dst, which must not exist.
+    With move, src is renamed when possible, which is atomic.
+    Else, or if src and dst are on different file systems, the files are hardlinked,
+    or reflinked/copied by copy_file(), and src is removed after with move.
+    With link=False, the files of dst are never hardlinks: the files are copied,
+    and the renamed files that have other links (to a store or another output) are replaced by a copy.
+    """
+    make_dirname(os.path.abspath(dst))
+    if move:
+        try:
+            os.rename(src, dst)
+            if not link:
+                for dirpath, _dirnames, filenames in os.walk(dst):
+                    for f in filenames:
+                        if not os.path.islink(os.path.join(dirpath, f)):
+                            _unshare_file(os.path.join(dirpath, f))
+            return
+        except OSError:
+            pass
+    
+    can_link = link
+    for dirpath, dirnames, filenames in os.walk(src):
+        target = os.path.normpath(os.path.join(dst, os.path.relpath(dirpath, src)))
+        os.makedirs(target, exist_ok=True)
+        for d in dirnames:
+            # os.walk() doesn't follow the symlinks to folders
+            if os.path.islink(os.path.join(dirpath, d)):
+                os.symlink(os.readlink(os.path.join(dirpath, d)), os.path.join(target, d))
+        for f in filenames:
+            file = os.path.join(dirpath, f)
+            if os.path.islink(file):
+                os.symlink(os.readlink(file), os.path.join(target, f))
+                continue
+            if can_link:
+                try:
+                    os.link(file, os.path.join(target, f))
+                    continue
+                except OSError:
+                    # most likely another file system, don't try again
+                    can_link = False
+            copy_file(file, os.path.join(target, f))
+    
+    if move:
+        safe_del(src)
+
+def _rename_exchange(path_a, path_b) -> bool:
+    """
+    Swap atomically two existing paths, with renameat2(RENAME_EXCHANGE) on Linux.
+    Return False if the system or the file system can't.
+    """
+    import sys
+    if not sys.platform.startswith('linux'):
+        return False
+    
+    import ctypes
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return False
+    AT_FDCWD = -100
+    RENAME_EXCHANGE = 2
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    renameat2.restype = ctypes.c_int
+    return renameat2(AT_FDCWD, os.fsencode(path_a), AT_FDCWD, os.fsencode(path_b), RENAME_EXCHANGE) == 0
+
+def replace_tree(src, dst, move=False, link=True):
+    """
+    Replace the folder dst by src, see materialize_tree().
+    The new tree is prepared next to dst, so dst is never a partial or half-deleted tree.
+    On Linux, the new and the old trees are swapped atomically;
+    elsewhere, dst don't exist during the short time between the two renames of the swap.
+    """
+    dst = os.path.abspath(dst)
+    suffix = '.'+ str(os.getpid())
+    new = dst +'.new'+ suffix
+    old = dst +'.old'+ suffix
+    safe_del(new)
+    safe_del(old)
+    
+    materialize_tree(src, new, move, link)
+    if os.path.lexists(dst) and _rename_exchange(new, dst):
+        # new is now the old tree
+        safe_del(new)
+        return
+    if os.path.lexists(dst):
+        os.rename(dst, old)
+    os.rename(new, dst)
+    safe_del(old)
+
+
+DOWNLOAD_WORKERS = 8
+
+def download_asset(url, file, hash):
+    if not hash_test(hash, file):
+        materialize_file(fetch_asset_object(url, hash), file)
+        # same content as the verified object
+        HASH_INDEX.record(file, hash)
+
+def download_assets(assets, workers=None, progress=None):
+    """
+    Download a batch of assets on a bounded pool of threads.
+    The files already present with the right hash are skipped.
+    
+    :type assets:       list[tuple[str, str, str]]
+    :param assets:      (url, file, hash) of each asset to download
+    :type workers:      int
+    :param workers:     Maximum number of concurrent downloads
+    :type progress:     Callable[[int, int], None]
+    :param progress:    Called with (done, total) after each asset
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    assets = list(assets)
+    total = len(assets)
+    with ThreadPoolExecutor(max_workers=max(1, workers or DOWNLOAD_WORKERS)) as executor:
+        futures = [executor.submit(download_asset, *a) for a in assets]
+        for done, future in enumerate(as_completed(futures), start=1):
+            future.result()
+            if progress:
+                progress(done, total)
 
 
 _VERSION_MANIFEST_PATH = os.path.join('version_manifest.json')
-VERSION_MANIFEST = read_json(_VERSION_MANIFEST_PATH, {'latest':{'release': None, 'snapshot': None}, 'versions':[], 'pack_format':{}, 'versioning':{}, 'versions_history':[]})
+MOJANG_VERSION_MANIFEST_URL = 'https://launchermeta.mojang.com/mc/game/version_manifest_v2.json'
 
-LATEST_RELEASE = VERSION_MANIFEST.get('latest', {}).get('release')
-LATEST_SNAPSHOT = VERSION_MANIFEST.get('latest', {}).get('snapshot')
+class VersionIndex():
+    """
+    Lookup tables of a version manifest, by id of version.
+    Built once from the manifest, it must be built again when the manifest is edited.
+    """
+    
+    def __init__(self, manifest):
+        # the first match win, like a linear search of the manifest
+        self.entries = {}
+        for v in manifest.get('versions', []):
+            if v['id'] not in self.entries or (v.get('url') and not self.entries[v['id']].get('url')):
+                self.entries[v['id']] = v
+        
+        self.paths = {}
+        self.developments = {}
+        for k,v in manifest.get('versioning', {}).items():
+            if isinstance(v, list):
+                for id in v:
+                    self.paths.setdefault(id, os.path.join(k, id))
+                    self.developments.setdefault(id, (id, k))
+            else:
+                for id in v.get('releases', []):
+                    self.paths.setdefault(id, os.path.join('releases', id))
+                    self.developments.setdefault(id, (id, None))
+                for kk,vv in v.items():
+                    for id in vv:
+                        self.paths.setdefault(id, os.path.join('snapshots', k, kk, id))
+                        self.developments.setdefault(id, (k, id))
+        
+        self.pack_formats = {}
+        for kind,formats in manifest.get('pack_format', {}).items():
+            for format,ids in formats.items():
+                for id in ids:
+                    self.pack_formats.setdefault(id, {}).setdefault(kind, format)
+    
+    def entry(self, version) -> dict|None:
+        return self.entries.get(version)
+    
+    def url(self, version) -> str|None:
+        return (self.entries.get(version) or {}).get('url')
+    
+    def path(self, version) -> str|None:
+        return self.paths.get(version)
+    
+    def development(self, version) -> tuple[str, str|None]|None:
+        return self.developments.get(version)
+    
+    def pack_format(self, version, kind=None) -> dict[str, str]|str|None:
+        """The pack formats of a version by kind (resource, data...), or the one of kind."""
+        formats = self.pack_formats.get(version, {})
+        if kind:
+            return formats.get(kind)
+        return dict(formats)
+
+def _load_version_manifest():
+    global VERSION_MANIFEST, VERSION_INDEX, LATEST_RELEASE, LATEST_SNAPSHOT
+    if 'VERSION_MANIFEST' in globals():
+        return
+    
+    VERSION_MANIFEST = read_json(_VERSION_MANIFEST_PATH, {'latest':{'release': None, 'snapshot': None}, 'versions':[], 'pack_format':{}, 'versioning':{}, 'versions_history':[]})
+    VERSION_INDEX = VersionIndex(VERSION_MANIFEST)
+    LATEST_RELEASE = VERSION_MANIFEST.get('latest', {}).get('release')
+    LATEST_SNAPSHOT = VERSION_MANIFEST.get('latest', {}).get('snapshot')
 
 def update_version_manifest():
-    global VERSION_MANIFEST, LATEST_RELEASE, LATEST_SNAPSHOT
+    global VERSION_MANIFEST, VERSION_INDEX, LATEST_RELEASE, LATEST_SNAPSHOT
+    
+    _load_github()
+    _load_cache()
+    _load_version_manifest()
     
     edited = not os.path.exists(_VERSION_MANIFEST_PATH)
     _init_release = VERSION_MANIFEST['latest']['release']
@@ -199,9 +1509,15 @@ def update_version_manifest():
             VERSION_MANIFEST['versions_history'] = list(versions.keys())
             return edited
     
+    from concurrent.futures import ThreadPoolExecutor
+    
+    # the two manifests are fetched at the same time
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        github_future = executor.submit(HTTP_CACHE.get_json, GITHUB_DATA.get_raw('main', 'version_manifest.json'))
+        mojang_future = executor.submit(HTTP_CACHE.get_json, MOJANG_VERSION_MANIFEST_URL)
+    
     try:
-        with urlopen(GITHUB_DATA.get_raw('main', 'version_manifest.json')) as fl:
-            github_manifest = json.load(fl)
+        github_manifest = github_future.result()
     except Exception:
         github_manifest = None
     
@@ -251,9 +1567,14 @@ def update_version_manifest():
         if sub_tree('pack_format'):
             edited = True
     
-    with urlopen('https://launchermeta.mojang.com/mc/game/version_manifest_v2.json') as fl:
-        if read_version_manifest(json.load(fl)):
-            edited = True
+    try:
+        mojang_manifest = mojang_future.result()
+    except OSError:
+        if not HTTP_CACHE.offline:
+            raise
+        mojang_manifest = None
+    if mojang_manifest and read_version_manifest(mojang_manifest):
+        edited = True
     
     if _init_release != VERSION_MANIFEST['latest']['release']:
         edited = True
@@ -267,12 +1588,14 @@ def update_version_manifest():
         print('INFO: version_manifest.json has been updated')
     
     VERSION_MANIFEST = read_json(_VERSION_MANIFEST_PATH)
+    VERSION_INDEX = VersionIndex(VERSION_MANIFEST)
     LATEST_RELEASE = VERSION_MANIFEST.get('latest', {}).get('release')
     LATEST_SNAPSHOT = VERSION_MANIFEST.get('latest', {}).get('snapshot')
 
 def update_pack_format(path_version_json, version):
-    global VERSION_MANIFEST
+    global VERSION_MANIFEST, VERSION_INDEX
     
+    _load_version_manifest()
     if not os.path.exists(path_version_json):
         return
     
@@ -302,6 +1625,7 @@ def update_pack_format(path_version_json, version):
             (k, dict(sorted(v.items(), key=key_sort, reverse=True))) for k,v in pack_format.items()
         ))
         write_json(_VERSION_MANIFEST_PATH, VERSION_MANIFEST)
+        VERSION_INDEX = VersionIndex(VERSION_MANIFEST)
         print("INFO: 'pack_format' in version_manifest.json has been updated")
 
 CALENDAR_VERSION = re.compile(r'^(\d{2}\.\d)(\.\d)?(?:-([\w\-]+)-\d+)?$')
@@ -310,8 +1634,9 @@ def update_calendar_versioning(version):
     if not (match_id := CALENDAR_VERSION.match(version)):
         print(f'The version {version!r} is not a calendar format.')
         return False
-    global VERSION_MANIFEST
+    global VERSION_MANIFEST, VERSION_INDEX
     
+    _load_version_manifest()
     version_id = match_id.group(0)
     version = match_id.group(1)
     
@@ -348,39 +1673,18 @@ def update_calendar_versioning(version):
     type_lst.insert(0, version_id)
     
     write_json(_VERSION_MANIFEST_PATH, VERSION_MANIFEST)
+    VERSION_INDEX = VersionIndex(VERSION_MANIFEST)
     print("INFO: 'versioning' in version_manifest.json has been updated")
     return True
 
 def version_path(version):
-    for k,v in VERSION_MANIFEST['versioning'].items():
-        if isinstance(v, list):
-            if version in v:
-                return os.path.join(k, version)
-        else:
-            if version in v.get('releases', []):
-                return os.path.join('releases', version)
-            
-            for kk,vv in v.items():
-                if version in vv:
-                    return os.path.join('snapshots', k, kk, version)
-    
-    return version
+    _load_version_manifest()
+    return VERSION_INDEX.path(version) or version
 
 def version_developement(version):
     # get the version cycle of a snapshot
-    for k,v in VERSION_MANIFEST['versioning'].items():
-        if isinstance(v, list):
-            if version in v:
-                return version, k
-        else:
-            if version in v.get('releases', []):
-                return version, None
-            
-            for kk,vv in v.items():
-                if version in vv:
-                    return k, version
-    
-    return version, None
+    _load_version_manifest()
+    return VERSION_INDEX.development(version) or (version, None)
 
 def find_output(version):
     import glob
@@ -393,6 +1697,7 @@ def get_latest(version, manifest_json_path=None):
     if manifest_json_path:
         return read_json(manifest_json_path, {'id': None})['id']
     
+    _load_version_manifest()
     if version in ['r','release']:
         return LATEST_RELEASE
     if version in ['s','snapshot', 'l', 'latest']:
@@ -406,6 +1711,7 @@ def valide_version(version, quiet = False, manifest_json_path = None):
         return read_json(manifest_json_path, {'id': None})['id']
     
     else:
+        _load_version_manifest()
         if not version:
             if quiet:
                 print('No version or "manifest_json.json" are declared. One of them are require in quiet mode.')
@@ -415,9 +1721,8 @@ def valide_version(version, quiet = False, manifest_json_path = None):
         
         version = get_latest(version)
         
-        for v in VERSION_MANIFEST['versions']:
-            if v['id'] == version and v['url']:
-                return version
+        if VERSION_INDEX.url(version):
+            return version
         
         
         print(f'The version {version} has invalide.', '' if quiet else ' Press any key to exit.')
@@ -437,11 +1742,8 @@ def valide_output(args):
 def read_manifest_json(temp, version, manifest_json_path = None):
     import zipfile
     
-    manifest_url = None
-    for v in VERSION_MANIFEST['versions']:
-        if v['id'] == version and v['url']:
-            manifest_url = v['url']
-            break
+    _load_version_manifest()
+    manifest_url = VERSION_INDEX.url(version)
     
     if not manifest_json_path and not manifest_url:
         print(f'Imposible to build Generated data for {version}. The requested version is not in the "version_manifest.json".')
@@ -488,12 +1790,9 @@ def serialize_nbt(file, output_file=None):
 
 
 def info_latest_version():
-    for v in VERSION_MANIFEST['versions']:
-        if v['id'] == LATEST_SNAPSHOT:
-            latest = v
-    for v in VERSION_MANIFEST['versions']:
-        if v['id'] == LATEST_RELEASE:
-            release = v
+    _load_version_manifest()
+    latest = VERSION_INDEX.entry(LATEST_SNAPSHOT)
+    release = VERSION_INDEX.entry(LATEST_RELEASE)
     print('latest:', LATEST_SNAPSHOT, '['+latest['releaseTime']+']')
     print('release:', LATEST_RELEASE, '['+release['releaseTime']+']')
 
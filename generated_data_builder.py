@@ -5,48 +5,74 @@ import argparse
 import glob
 import os.path
 import pathlib
-from contextlib import suppress
+from array import array
 from collections import OrderedDict, defaultdict
 from typing import Callable
 from tempfile import gettempdir
 
 from common import (
-    find_output, get_latest, version_path, hash_test, make_dirname,
-    read_manifest_json, run_animation, safe_del, urlretrieve, urlopen,
-    read_json, read_lines, read_text, write_json, write_lines, write_text,
+    DOWNLOAD_WORKERS, ZIP_METHODS, check_zip_level, extract_zip, find_output, format_throughput, get_latest, version_path, hash_test, make_zip, materialize_file, replace_tree,
+    read_manifest_json, run_animation, safe_del, urlopen, download_file, download_assets, fetch_asset_object,
+    flush_output, read_json, read_lines, read_text, write_json, write_lines, write_text,
 )
 
 VERSION = (0, 46, 2)
 
-parser = argparse.ArgumentParser()
+parser = argparse.ArgumentParser(epilog='The files of the output can be hardlinks to the shared assets store and to the output of --base: treat the output as read-only, replace a file instead of editing it in place.')
 parser.add_argument('-v', '--version', help='Target version ; the version must be installed.\nr or release for the last release\ns or snapshot for the last snapshot.')
+parser.add_argument('--versions', help='Build several versions, the data generators of their servers run concurrently.', nargs='+')
+parser.add_argument('--jvm-workers', help='Maximum number of data generators running at the same time with --versions. Default: 2', type=int, default=2)
 
 parser.add_argument('-q', '--quiet', help='Execute without any user interaction. Require --version or --manifest-json.', action='store_true')
 parser.add_argument('-f', '--overwrite', help='Overwrite on the existing output folder.', action='store_true')
 
 parser.add_argument('-z', '--zip', help='Empack the folder in a zip after it\'s creation', action='store_true', default=None)
 parser.add_argument('--no-zip', dest='zip', help='Don\'t ask for empack the folder in a zip', action='store_false')
+parser.add_argument('--zip-method', help='Compression method of the zip. Default: deflate', choices=ZIP_METHODS, default='deflate')
+parser.add_argument('--zip-level', help='Compression level of the zip: 0-9 for deflate and lzma, 1-9 for bzip2, none for store. Default: the default level of the method', type=int)
 
 parser.add_argument('-o', '--output', help='Output folder', type=pathlib.Path)
 parser.add_argument('--manifest-json', help='Local JSON manifest file of the target version.', type=pathlib.Path)
+parser.add_argument('--base', help='Output folder of a previous version. The files unchanged since this version are copied from it instead of being processed again.', type=pathlib.Path)
+parser.add_argument('--download-workers', help=f'Number of concurrent assets downloads. Default: {DOWNLOAD_WORKERS}', type=int, default=DOWNLOAD_WORKERS)
+parser.add_argument('--extract-workers', help='Number of threads used to extract the client.jar. Default: 1', type=int, default=1)
+parser.add_argument('-j', '--jobs', help='Number of processes used to generate the /lists/ folder and the NBT serialized. Default: 1', type=int, default=1)
+parser.add_argument('--no-incremental', dest='incremental', help='With --base, generate again all the /lists/ folder, even the parts unchanged since the base version.', action='store_false')
+parser.add_argument('--skip-unchanged', help='Don\'t rewrite the files that already have the same content. Only useful when the files are generated again over existing ones, like the in-place update of a /lists/ folder by listing_various_data_alt(); a build starts from a new tree, where it changes nothing.', action='store_true')
+parser.add_argument('--offline', help='Don\'t update the version manifest from the network, use the cached copies.', action='store_true')
+parser.add_argument('--reverify', help='Ignore the hash index and verify again the hash of all the files.', action='store_true')
+parser.add_argument('--profile', help='Dump the cProfile stats of each stage in a "<version>.profile" folder next to the output.', action='store_true')
 
 def parse_args():
-    return parser.parse_args()
+    args = parser.parse_args()
+    try:
+        check_zip_level(args.zip_method, args.zip_level)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
 
 def main(args):
-    from common import GITHUB_BUILDER, update_version_manifest, valide_output, valide_version, work_done
+    from common import GITHUB_BUILDER, HASH_INDEX, HTTP_CACHE, WRITE_STATS, update_version_manifest, valide_output, valide_version, work_done
     
+    HASH_INDEX.reverify = args.reverify
+    HTTP_CACHE.offline = args.offline
+    WRITE_STATS.compare = args.skip_unchanged
     update_version_manifest()
     
     print(f'--==| Minecraft: Generated data builder {VERSION} |==--')
     print()
     
-    last, _versions, _versions_info = GITHUB_BUILDER.check_releases()
-    if last > VERSION:
-        print('A new version is available!')
-        print()
+    if not args.offline:
+        last, _versions, _versions_info = GITHUB_BUILDER.check_releases()
+        if last > VERSION:
+            print('A new version is available!')
+            print()
     
-    args.version = valide_version(args.version, args.quiet, args.manifest_json)
+    if args.versions:
+        versions = list(dict.fromkeys(valide_version(v, args.quiet) for v in args.versions))
+        args.version = versions[0]
+    else:
+        args.version = valide_version(args.version, args.quiet, args.manifest_json)
     
     valide_output(args)
     
@@ -59,15 +85,23 @@ def main(args):
     
     print()
     
-    error = build_generated_data(args)
+    if args.versions:
+        async def data_servers():
+            prepare_data_servers(versions, args.jvm_workers)
+        run_animation(data_servers, f'Extracting data server of {len(versions)} versions')
+        error = 0
+        for version in versions:
+            args.version = version
+            error = build_generated_data(args) or error
+            print()
+    else:
+        error = build_generated_data(args)
     work_done(error, args.quiet)
     return error
 
 TEMP_DIR = os.path.abspath(os.path.join(gettempdir(), 'MC_Generated_data'))
 
 def build_generated_data(args):
-    import shutil
-    import subprocess
     import zipfile
     from datetime import datetime
     
@@ -77,6 +111,10 @@ def build_generated_data(args):
     temp = os.path.join(temp_root, 'generated')
     os.makedirs(temp_root, exist_ok=True)
     
+    from common import HASH_INDEX
+    # temp is moved to the output at the end, its files don't need to stay indexed
+    HASH_INDEX.add_transient_root(temp)
+    
     
     manifest_json, manifest_url = read_manifest_json(temp_root, version, args.manifest_json)
     
@@ -116,8 +154,22 @@ def build_generated_data(args):
         print(f'Imposible to build Generated data for {version}. The output "{output}" already exit and the overwrite is not enabled.')
         return -1
     
+    from common import STAGE_STATS
+    
+    # the timing report and the profiles are next to the output
+    STAGE_STATS.reset()
+    STAGE_STATS.profile = os.path.normpath(output)+'.profile' if args.profile else None
+    
     
-    print(f'Build Generated data for {version}')
+    base = base_version = None
+    if args.base:
+        base = os.path.abspath(args.base)
+        base_version = os.path.basename(base)
+        if not os.path.isdir(base) or not os.path.exists(os.path.join(base, base_version+'.json')):
+            print(f'The base "{args.base}" is not the output of a previous build. It will be ignored.')
+            base = base_version = None
+    
+    print(f'Build Generated data for {version}' + (f' from {base_version}' if base else ''))
     
     dt = datetime.fromisoformat(version_json['releaseTime'])
     
@@ -127,7 +179,7 @@ def build_generated_data(args):
     async def client_dl():
         if not hash_test(client_sha1, client):
             safe_del(client)
-            urlretrieve(version_json['client'], client)
+            download_file(version_json['client'], client, client_sha1)
     run_animation(client_dl, 'Downloading client.jar')
     
     
@@ -136,39 +188,60 @@ def build_generated_data(args):
         async def server_dl():
             if version_json['server'] and not hash_test(server_sha1, server):
                 safe_del(server)
-                urlretrieve(version_json['server'], server)
+                download_file(version_json['server'], server, server_sha1)
         run_animation(server_dl, 'Downloading server.jar')
         
+        server_stats = {}
         async def data_server():
-            lst_cmd = (
-                ('java', '-DbundlerMainClass=net.minecraft.data.Main', '-jar', 'server.jar', '--all'),
-                ('java', '-cp', 'server.jar', 'net.minecraft.data.Main', '--all'),
-            )
-            
-            for cmd in lst_cmd:
-                subprocess.run(cmd, cwd=temp_root, shell=False, capture_output=False, stdout=subprocess.DEVNULL)
-        run_animation(data_server, 'Extracting data server')
+            if not os.path.exists(server):
+                server_stats['text'] = '> no server.jar'
+            elif take_data_server_done(temp_root):
+                server_stats['text'] = '> OK (prepared)'
+            else:
+                style, code = run_data_server(temp_root)
+                server_stats['text'] = f'> OK ({style})' if not code else f'> failed ({style}, exit code {code})'
+        run_animation(data_server, 'Extracting data server', lambda: server_stats['text'])
     
     
+    client_stats = {}
     async def data_client():
+        import time
+        
+        start = time.perf_counter()
         with zipfile.ZipFile(client, mode='r') as zip:
+            entries = []
+            legacy_entries = []
+            additional_entries = []
+            has_assets = os.path.exists(os.path.join(temp, 'assets'))
             for entry in zip.filelist:
                 if entry.filename.startswith('assets/') or entry.filename.startswith('data/'):
-                    safe_del(os.path.join(temp, entry.filename))
-                    zip.extract(entry.filename, temp)
+                    entries.append((entry, temp))
+                    if entry.filename.startswith('assets/'):
+                        has_assets = True
+                if entry.filename.endswith('.png') or entry.filename.endswith('.txt') or entry.filename.endswith('.lang'):
+                    legacy_entries.append((entry, os.path.join(temp, 'assets')))
+                # additional files to extract
+                if entry.filename in ('pack.png', 'version.json'):
+                    additional_entries.append((entry, temp))
             
-            if not os.path.exists(os.path.join(temp, 'assets')):
-                for entry in zip.filelist:
-                    if entry.filename.endswith('.png') or entry.filename.endswith('.txt') or entry.filename.endswith('.lang'):
-                        safe_del(os.path.join(temp, 'assets', entry.filename))
-                        zip.extract(entry.filename, os.path.join(temp, 'assets'))
+            if not has_assets:
+                entries.extend(legacy_entries)
             else:
-                # additional files to extract
-                for name in ('pack.png', 'version.json'):
-                    with suppress(KeyError):
-                        zip.extract(name, temp)
+                entries.extend(additional_entries)
             
-    run_animation(data_client, 'Extracting data client')
+            client_stats['forwarded'] = 0
+            if base:
+                entries, forward = base_unchanged_entries(entries, temp, base, os.path.join(TEMP_DIR, base_version, 'client.jar'))
+                for src, dst in forward:
+                    materialize_file(src, dst)
+                client_stats['forwarded'] = len(forward)
+            
+            client_stats['count'], client_stats['size'] = extract_zip(zip, entries, args.extract_workers)
+        client_stats['time'] = time.perf_counter() - start
+    run_animation(data_client, 'Extracting data client',
+        lambda: '> OK ('+ format_throughput(client_stats['count'], client_stats['size'], client_stats['time'])
+            + (', '+ str(client_stats['forwarded']) +' unchanged' if base else '') +')',
+    )
     
     async def assets_dl():
         assets_json = {}
@@ -179,7 +252,7 @@ def build_generated_data(args):
     run_animation(assets_dl, 'Downloading assets.json')
     
     async def assets_files_dl():
-        downloading_assets_files(temp)
+        downloading_assets_files(temp, args.download_workers, base)
     run_animation(assets_files_dl, 'Downloading assets files')
     
     write_json(os.path.join(temp, version+'.json') , version_json)
@@ -199,37 +272,227 @@ def build_generated_data(args):
             safe_del(os.path.join(temp_root, f))
         
         uniform_reports(temp)
-        listing_various_data(temp)
+        # temp is a new tree at each build, the manifest can only skip work when it is seeded from a base version
+        # (the manifest is also recorded, for the builds that will use this version as base)
+        manifest_path = None
+        if base and args.incremental:
+            listing_copy_forward(temp, base, os.path.join(TEMP_DIR, base_version, 'generated'))
+            manifest_path = listing_manifest_path(temp)
+        listing_various_data(temp, args.jobs, manifest_path=manifest_path)
     run_animation(listing_various, 'Generating /list/ folder')
     
     async def write_serialize():
-        write_serialize_nbt(temp)
+        write_serialize_nbt(temp, args.jobs)
     run_animation(write_serialize, 'Generating NBT serialized')
     
     
     if args.zip:
-        async def make_zip():
+        zip_stats = {}
+        async def empack_zip():
+            import time
+            
+            start = time.perf_counter()
             zip_path = os.path.join(temp_root, 'zip.zip')
             zip_version_path = os.path.join(temp, version+'.zip')
             safe_del(zip_path)
             safe_del(zip_version_path)
-            shutil.make_archive(os.path.splitext(zip_path)[0], 'zip', root_dir=temp)
+            zip_stats['count'], zip_stats['size'] = make_zip(zip_path, temp, args.zip_method, args.zip_level)
             os.rename(zip_path, zip_version_path)
-        run_animation(make_zip, 'Empack into a ZIP')
+            zip_stats['time'] = time.perf_counter() - start
+        run_animation(empack_zip, 'Empack into a ZIP',
+            lambda: '> OK ('+ format_throughput(zip_stats['count'], zip_stats['size'], zip_stats['time']) +')',
+        )
     
     async def move_generated_data():
-        if os.path.exists(output):
-            if args.overwrite:
-                safe_del(output)
-            else:
-                print(f'The output at "{output}" already exit and the overwrite is not enable')
-                return -1
+        if os.path.exists(output) and not args.overwrite:
+            print(f'The output at "{output}" already exit and the overwrite is not enable')
+            return -1
         
-        os.makedirs(output, exist_ok=True)
-        for dir in os.listdir(temp):
-            shutil.move(os.path.join(temp, dir), os.path.join(output, dir))
+        # the files stay hardlinked to the assets store and to the base output, the output is read-only
+        replace_tree(temp, output, move=True)
         
     run_animation(move_generated_data, f'Move generated data to "{output}"')
+    
+    from common import HTTP_POOL, WRITE_STATS
+    print(WRITE_STATS.summary())
+    if HTTP_POOL.stats():
+        print(HTTP_POOL.summary())
+    
+    STAGE_STATS.write(os.path.normpath(output)+'.timings.json')
+    print(f'Timing report written to "{os.path.normpath(output)}.timings.json"')
+
+def server_launch_style(server) -> str:
+    """
+    'bundler' for a server.jar that unpack its libraries at launch (1.18 and later),
+    'classpath' for a server.jar that contains them.
+    """
+    import zipfile
+    
+    with zipfile.ZipFile(server) as zip:
+        return 'bundler' if 'META-INF/versions.list' in zip.NameToInfo else 'classpath'
+
+def data_server_command(style) -> tuple[str, ...]:
+    if style == 'bundler':
+        return ('java', '-DbundlerMainClass=net.minecraft.data.Main', '-jar', 'server.jar', '--all')
+    return ('java', '-cp', 'server.jar', 'net.minecraft.data.Main', '--all')
+
+def bundler_cache_path(hash):
+    from common import CACHE_DIR
+    return os.path.join(CACHE_DIR, 'bundler', hash[0:2], hash)
+
+def seed_bundler_files(server, temp_root) -> int:
+    """
+    Place in temp_root the libraries/ and versions/ files that the bundler of server.jar unpack,
+    from a cache by SHA-256 shared by all the versions.
+    The bundler don't unpack again the files already present with the right hash.
+    Return the number of files found in the cache.
+    """
+    import hashlib
+    import threading
+    import zipfile
+    
+    from common import make_dirname
+    
+    reused = 0
+    with zipfile.ZipFile(server) as zip:
+        for folder in ('libraries', 'versions'):
+            list_name = f'META-INF/{folder}.list'
+            if list_name not in zip.NameToInfo:
+                continue
+            for line in zip.read(list_name).decode('utf-8').splitlines():
+                if not line.strip():
+                    continue
+                hash, _id, path = line.split('\t')
+                cached = bundler_cache_path(hash)
+                if os.path.exists(cached):
+                    reused += 1
+                else:
+                    tmp = f'{cached}.{os.getpid()}-{threading.get_ident()}.tmp'
+                    make_dirname(tmp)
+                    hasher = hashlib.sha256()
+                    try:
+                        with zip.open(f'META-INF/{folder}/{path}') as src, open(tmp, 'wb') as dst:
+                            while chunk := src.read(2**20):
+                                dst.write(chunk)
+                                hasher.update(chunk)
+                        if hasher.hexdigest() != hash:
+                            # let the bundler deal with it
+                            continue
+                        os.replace(tmp, cached)
+                    finally:
+                        safe_del(tmp)
+                materialize_file(cached, os.path.join(temp_root, folder, path))
+    return reused
+
+def run_data_server(temp_root) -> tuple[str, int]:
+    """
+    Run the data generator of the server.jar in temp_root, with the launch style of this server.
+    Return the style and the exit code of Java.
+    """
+    import subprocess
+    
+    server = os.path.join(temp_root, 'server.jar')
+    style = server_launch_style(server)
+    if style == 'bundler':
+        seed_bundler_files(server, temp_root)
+    
+    process = subprocess.run(data_server_command(style), cwd=temp_root, shell=False, capture_output=False, stdout=subprocess.DEVNULL)
+    return style, process.returncode
+
+DATA_SERVER_DONE = 'data_server.json'
+
+def take_data_server_done(temp_root) -> bool:
+    """
+    If the data of the server.jar in temp_root has already been generated by prepare_data_servers().
+    The mark is consumed, the next build run the data generator again.
+    """
+    from common import hash_file_indexed
+    
+    done = os.path.join(temp_root, DATA_SERVER_DONE)
+    if not os.path.exists(done):
+        return False
+    mark = read_json(done)
+    safe_del(done)
+    return mark.get('server') == hash_file_indexed(os.path.join(temp_root, 'server.jar')) and os.path.isdir(os.path.join(temp_root, 'generated'))
+
+def prepare_data_servers(versions, jvm_workers=2) -> dict[str, int|None]:
+    """
+    Download the server.jar and run the data generator of several versions concurrently,
+    with at most jvm_workers JVMs at the same time.
+    build_generated_data() use the prepared data instead of running the generator again.
+    Return the exit code of Java by version, None if the version has no data generator.
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import datetime
+    
+    from common import hash_file_indexed
+    
+    jvm_slots = threading.BoundedSemaphore(max(1, jvm_workers))
+    
+    def prepare(version):
+        temp_root = os.path.join(TEMP_DIR, version)
+        os.makedirs(temp_root, exist_ok=True)
+        safe_del(os.path.join(temp_root, DATA_SERVER_DONE))
+        manifest_json = read_manifest_json(temp_root, version)
+        if manifest_json == -1:
+            return None
+        manifest_json = manifest_json[0]
+        server_download = manifest_json.get('downloads', {}).get('server')
+        if not server_download or datetime.fromisoformat(manifest_json['releaseTime']).year < 2018:
+            return None
+        
+        server = os.path.join(temp_root, 'server.jar')
+        if not hash_test(server_download['sha1'], server):
+            safe_del(server)
+            download_file(server_download['url'], server, server_download['sha1'])
+        
+        with jvm_slots:
+            safe_del(os.path.join(temp_root, 'generated'))
+            style, code = run_data_server(temp_root)
+        if not code:
+            write_json(os.path.join(temp_root, DATA_SERVER_DONE), {'server': hash_file_indexed(server), 'style': style})
+        return code
+    
+    with ThreadPoolExecutor(max_workers=len(versions) or 1) as executor:
+        return dict(zip(versions, executor.map(prepare, versions)))
+
+def base_unchanged_entries(entries, temp, base, base_jar=None):
+    """
+    Split the entries of the client.jar between the ones to extract,
+    and the ones unchanged since the base version that can be copied from its output.
+    
+    The entries are compared to the central directory of the base client.jar,
+    or to the CRC of the files of the base output if this jar is no longer available.
+    """
+    from common import crc_file, zip_crc_index
+    
+    base_index = None
+    if base_jar and os.path.exists(base_jar):
+        base_index = zip_crc_index(base_jar)
+    
+    extract = []
+    forward = []
+    for info, dest in entries:
+        parts = info.filename.split('/')
+        if info.is_dir() or info.filename.startswith('/') or os.path.pardir in parts:
+            extract.append((info, dest))
+            continue
+        
+        base_file = os.path.normpath(os.path.join(base, os.path.relpath(dest, temp), *parts))
+        unchanged = os.path.isfile(base_file) and os.path.getsize(base_file) == info.file_size
+        if unchanged:
+            if base_index is not None:
+                unchanged = base_index.get(info.filename) == (info.CRC, info.file_size)
+            else:
+                unchanged = crc_file(base_file) == info.CRC
+        
+        if unchanged:
+            forward.append((base_file, os.path.join(dest, *parts)))
+        else:
+            extract.append((info, dest))
+    
+    return extract, forward
 
 def downloading_assets_json(temp):
     import json
@@ -254,17 +517,22 @@ def downloading_assets_json(temp):
     write_json(os.path.join(temp, 'assets.json'), assets_json)
     write_lines(os.path.join(temp, 'assets.txt'), sorted(assets_json['objects'].keys()))
 
-def downloading_assets_files(temp):
+def downloading_assets_files(temp, workers=None, base=None):
     assets = read_json(os.path.join(temp, 'assets.json'))['objects']
+    base_assets = read_json(os.path.join(base, 'assets.json')).get('objects', {}) if base else {}
     
+    lst_dl = []
     def write_asset(file):
         if file in assets:
             asset = assets[file]
-            file = os.path.join(temp, 'assets', file)
-            if not hash_test(asset['hash'], file):
-                safe_del(file)
-                make_dirname(file)
-                urlretrieve(asset['url'], file)
+            path = os.path.join(temp, 'assets', file)
+            if base_assets.get(file, {}).get('hash') == asset['hash']:
+                # unchanged since the base version
+                base_path = os.path.join(base, 'assets', file)
+                if os.path.isfile(base_path) and os.path.getsize(base_path) == asset['size']:
+                    materialize_file(base_path, path)
+                    return
+            lst_dl.append((asset['url'], path, asset['hash']))
     
     assets_dl = [
         'minecraft/sounds.json',
@@ -281,6 +549,10 @@ def downloading_assets_files(temp):
         for a in assets:
             if a.startswith(p):
                 write_asset(a)
+    
+    def progress(done, total):
+        run_animation.extra = f'{done}/{total}'
+    download_assets(lst_dl, workers, progress)
 
 
 class TBLpool():
@@ -288,22 +560,30 @@ class TBLpool():
         self.rolls = ''
         self.comment = ''
         self.entries :list[TBLentrie] = []
+        # total weight of each weight groupe, accumulated when the entries are added
+        self.weight_totals :dict[int, int] = {}
+        self.alternatives_groupes :set[int] = set()
     
     def append(self, item):
+        """The weight and the groupes of the entry must be set before it's added."""
         self.entries.append(item)
+        total = self.weight_totals.get(item.weight_groupe, 0)
+        if item.alternatives_groupe:
+            self.alternatives_groupes.add(item.alternatives_groupe)
+        else:
+            total += item.weight
+        self.weight_totals[item.weight_groupe] = total
     
-    def all_weight_groupes(self) -> list[int]:
-        rslt = set()
-        for e in self.entries:
-            rslt.add(e.weight_groupe)
-        return rslt
+    def all_weight_groupes(self) -> set[int]:
+        return set(self.weight_totals)
     
-    def all_alternatives_groupes(self) -> list[int]:
-        rslt = set()
-        for e in self.entries:
-            if e.alternatives_groupe:
-                rslt.add(e.alternatives_groupe)
-        return rslt
+    def all_alternatives_groupes(self) -> set[int]:
+        return set(self.alternatives_groupes)
+    
+    def probabilities(self) -> list:
+        """Exact probability (Fraction) of each entry inside its weight groupe, None for the entries without weight."""
+        from fractions import Fraction
+        return [Fraction(e.weight, e.total_weight) if e.weight else None for e in self.entries]
 
 class TBLentrie():
     def __init__(self, pool: TBLpool, weight_groupe: int = 0, alternatives_groupe: int = 0):
@@ -317,11 +597,9 @@ class TBLentrie():
     
     @property
     def total_weight(self) -> int:
-        rslt = 0
-        for e in self.pool.entries:
-            if not self.alternatives_groupe and e.weight_groupe == self.weight_groupe:
-                rslt += e.weight
-        return rslt
+        if self.alternatives_groupe:
+            return 0
+        return self.pool.weight_totals.get(self.weight_groupe, 0)
     
     @property
     def chance(self) -> float:
@@ -395,44 +673,184 @@ def write_tbl_md(path, head_tbl, lines_tbl):
     write_lines(path, rslt)
 
 
-def match_dir(temp, dirs) -> str:
+class TreeIndex():
+    """
+    In-memory index of a folder tree, built by a single os.scandir() walk.
+    The queries follow the rules of glob: the hidden entries are ignored
+    and the entries are returned in the same order.
+    """
+    
+    def __init__(self, root, exclude: list[str]=None):
+        self.root = os.path.abspath(root)
+        self._dirs: dict[str, tuple[list[str], list[str]]] = {}
+        self._files: set[str] = set()
+        self._scan('', set(os.path.normpath(x) for x in exclude or []))
+    
+    def _scan(self, rel, exclude):
+        dirs, files = [], []
+        self._dirs[rel] = dirs, files
+        try:
+            with os.scandir(os.path.join(self.root, rel)) as it:
+                entries = list(it)
+        except OSError:
+            return
+        
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            sub = os.path.join(rel, entry.name) if rel else entry.name
+            if sub in exclude:
+                continue
+            if entry.is_dir():
+                dirs.append(entry.name)
+                self._scan(sub, exclude)
+            else:
+                files.append(entry.name)
+                self._files.add(sub)
+    
+    def _rel(self, path) -> str|None:
+        rel = os.path.relpath(os.path.abspath(path), self.root)
+        if rel == os.curdir:
+            return ''
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        return rel
+    
+    def exists(self, path) -> bool:
+        rel = self._rel(path)
+        if rel is None:
+            return os.path.exists(path)
+        return rel in self._dirs or rel in self._files
+    
+    def isdir(self, path) -> bool:
+        rel = self._rel(path)
+        if rel is None:
+            return os.path.isdir(path)
+        return rel in self._dirs
+    
+    def subdirs(self, path) -> list[str]:
+        """Equivalent of glob('*/', root_dir=path), without the trailing separator"""
+        rel = self._rel(path)
+        if rel is None:
+            return [d.rstrip('\\/') for d in glob.glob('*/', root_dir=path, recursive=False)]
+        return list(self._dirs.get(rel, ((), ()))[0])
+    
+    def iglob(self, path, ext='', recursive=True):
+        """Equivalent of glob.iglob('**/*'+ext, root_dir=path, recursive=True), for files only"""
+        rel = self._rel(path)
+        if rel is None:
+            pattern = ('**/*' if recursive else '*') + ext
+            yield from (f for f in glob.iglob(pattern, root_dir=path, recursive=recursive) if os.path.isfile(os.path.join(path, f)))
+            return
+        
+        def walk(rel, prefix):
+            dirs, files = self._dirs.get(rel, ((), ()))
+            for f in files:
+                if f.endswith(ext):
+                    yield os.path.join(prefix, f) if prefix else f
+            if recursive:
+                for d in dirs:
+                    yield from walk(os.path.join(rel, d) if rel else d, os.path.join(prefix, d) if prefix else d)
+        yield from walk(rel, '')
+
+
+def match_dir(temp, dirs, index: TreeIndex=None) -> str:
+    exists = index.exists if index else os.path.exists
     rslt = None
     for rslt in dirs:
-        if os.path.exists(os.path.join(temp, rslt)):
+        if exists(os.path.join(temp, rslt)):
             break
     return rslt
 
 
-def get_datapack_paths(temp) -> list[tuple[str,str]]:
+def get_datapack_paths(temp, index: TreeIndex=None) -> list[tuple[str,str]]:
     sub_datapacks = 'data/minecraft/datapacks'
     rslt = ['']
-    for dp in glob.glob('*/', root_dir=os.path.join(temp, sub_datapacks), recursive=False):
+    if index:
+        lst = [os.path.join(d, '') for d in index.subdirs(os.path.join(temp, sub_datapacks))]
+    else:
+        lst = glob.glob('*/', root_dir=os.path.join(temp, sub_datapacks), recursive=False)
+    for dp in lst:
         rslt.append(os.path.join(sub_datapacks, dp))
     return rslt
 
-def get_structures_dir(temp) -> str:
+def get_structures_dir(temp, index: TreeIndex=None) -> str:
     return match_dir(temp, [
         'data/minecraft/structure',
         'data/minecraft/structures', # old
         'assets/minecraft/structures', # legacy
-    ])
+    ], index)
 
-def write_serialize_nbt(temp):
+def _serialize_nbt_chunk(chunk: list[tuple[str, str]]) -> int:
     from common import serialize_nbt
     
+    for file, output_file in chunk:
+        serialize_nbt(file=file, output_file=output_file)
+    return len(chunk)
+
+def _serialize_nbt_worker_init(compare):
+    from common import WRITE_STATS
+    WRITE_STATS.compare = compare
+
+def _serialize_nbt_worker_chunk(chunk: list[tuple[str, str]]) -> tuple[int, int, int, int]:
+    from common import WRITE_STATS
+    
+    # the counts of the process are returned to the main one
+    written, skipped, bytes = WRITE_STATS.written, WRITE_STATS.skipped, WRITE_STATS.bytes
+    count = _serialize_nbt_chunk(chunk)
+    return count, WRITE_STATS.written - written, WRITE_STATS.skipped - skipped, WRITE_STATS.bytes - bytes
+
+def write_serialize_nbt(temp, jobs=1, chunk_size=16):
+    """
+    Serialize the structures .nbt files into .snbt.
+    The .snbt files newer than their .nbt are kept as they are.
+    """
     # structures.snbt
     dir = get_structures_dir(temp)
     dir_snbt = dir+'.snbt'
+    
+    tasks = []
+    readme_dirs = []
     for dp in get_datapack_paths(temp):
         for f in glob.iglob('**/*.nbt', root_dir=os.path.join(temp, dp, dir), recursive=True):
-            serialize_nbt(
-                file=os.path.join(temp, dp, dir, f),
-                output_file=os.path.join(temp, dp, dir_snbt, os.path.splitext(f)[0]+'.snbt')
-            )
-            write_text(
-                os.path.join(temp, dp, dir_snbt, '!!readme.txt'),
-                SERIALIZE_NBT_README.format(os.path.basename(dir_snbt))
-            )
+            file = os.path.join(temp, dp, dir, f)
+            output_file = os.path.join(temp, dp, dir_snbt, os.path.splitext(f)[0]+'.snbt')
+            if os.path.join(temp, dp, dir_snbt) not in readme_dirs:
+                readme_dirs.append(os.path.join(temp, dp, dir_snbt))
+            try:
+                if os.stat(output_file).st_mtime_ns > os.stat(file).st_mtime_ns:
+                    continue
+            except OSError:
+                pass
+            tasks.append((file, output_file))
+    
+    for d in readme_dirs:
+        write_text(
+            os.path.join(d, '!!readme.txt'),
+            SERIALIZE_NBT_README.format(os.path.basename(dir_snbt))
+        )
+    
+    chunks = [tasks[i:i+chunk_size] for i in range(0, len(tasks), chunk_size)]
+    done = 0
+    def progress(count):
+        nonlocal done
+        done += count
+        run_animation.extra = f'{done}/{len(tasks)}'
+    
+    if not jobs or jobs <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            progress(_serialize_nbt_chunk(chunk))
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from common import WRITE_STATS
+        
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_serialize_nbt_worker_init, initargs=(WRITE_STATS.compare,)) as executor:
+            for future in as_completed([executor.submit(_serialize_nbt_worker_chunk, c) for c in chunks]):
+                count, count_written, count_skipped, count_bytes = future.result()
+                WRITE_STATS.add(count_written, count_skipped, count_bytes)
+                progress(count)
+    
+    return len(tasks)
 
 SERIALIZE_NBT_README = """\
 Attention! The folder /{}/ is not present in the original data files of Minecraft.
@@ -474,21 +892,26 @@ def str_to_json(text) -> dict|list:
     import json
     return json.loads(text)
 
-def enum_json(dir, is_tag=False, ns=None) -> list[str]:
-    lst = glob.iglob('**/*.json', root_dir=dir, recursive=True)
+def enum_json(dir, is_tag=False, ns=None, index: TreeIndex=None) -> list[str]:
+    if index:
+        lst = index.iglob(dir, '.json')
+    else:
+        lst = glob.iglob('**/*.json', root_dir=dir, recursive=True)
     return [('#' if is_tag else '')+namespace(filename(j), ns=ns) for j in lst]
 
-def get_languages_json(temp) -> dict[str, str]:
+def get_languages_json(temp, ctx: 'ListingContext'=None) -> dict[str, str]:
+    exists = ctx.index.exists if ctx else os.path.exists
+    
     path = os.path.join(temp, 'assets/minecraft/lang/en_us.json')
-    if os.path.exists(path):
-        return read_json(path)
+    if exists(path):
+        return ctx.read_json(path) if ctx else read_json(path)
     
     path = os.path.join(temp, 'assets/minecraft/lang/en_us.lang')
-    if os.path.exists(path):
+    if exists(path):
         return parse_languages_lang(path)
     
     path = os.path.join(temp, 'assets/lang/en_us.lang')
-    if os.path.exists(path):
+    if exists(path):
         return parse_languages_lang(path)
     
     return None
@@ -502,6 +925,63 @@ def parse_languages_lang(path) -> dict[str, str]:
         rslt[split[0]] = split[1]
     return rslt
 
+class ListingContext():
+    """
+    State shared by the listing functions during one build.
+    Each source file is parsed at most once, the parsed documents are keep
+    in a LRU cache limited by the size of their source files.
+    """
+    
+    def __init__(self, temp, index: TreeIndex=None, cache_size=64*1024*1024):
+        self.temp = temp
+        self.index = index or listing_index(temp)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, tuple[tuple[int, int], dict|list]] = OrderedDict()
+        self._cache_used = 0
+        self._languages_json = None
+    
+    def _uncache(self, path):
+        (_, size), _ = self._cache.pop(path)
+        self._cache_used -= size
+    
+    def read_json(self, path, cache=True) -> dict|list:
+        """
+        Read a JSON file of the build.
+        The document returned from the cache is shared, the callers that modify it must use cache=False
+        to get their own copy. A file modified or deleted since it was cached is read again.
+        """
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+            key = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            key = None
+        
+        if path in self._cache:
+            if self._cache[path][0] == key:
+                if cache:
+                    self._cache.move_to_end(path)
+                    return self._cache[path][1]
+            else:
+                self._uncache(path)
+        
+        rslt = read_json(path)
+        if cache and key and key[1] <= self.cache_size:
+            self._cache[path] = key, rslt
+            self._cache_used += key[1]
+            while self._cache_used > self.cache_size:
+                self._uncache(next(iter(self._cache)))
+        return rslt
+    
+    def languages_json(self) -> dict[str, str]:
+        if self._languages_json is None:
+            self._languages_json = get_languages_json(self.temp, self)
+        return self._languages_json
+
+def listing_index(temp) -> TreeIndex:
+    # the /lists/ folder is the output of the listing functions
+    return TreeIndex(temp, exclude=['lists'])
+
 def parse_json_text(json_text, languages_json) -> str|None:
     if json_text is None or isinstance(json_text, str):
         return json_text
@@ -544,19 +1024,15 @@ def seconds_to_human_duration(seconds):
         tbl.append(f'{seconds}s')
     return ' '.join(tbl)
 
-def human_duration_from_assets(temp, file):
+def human_duration_from_assets(temp, file, ctx: ListingContext=None):
     from mutagen.oggvorbis import OggVorbis
     
-    assets = read_json(os.path.join(temp, 'assets.json'))['objects']
+    assets_json = os.path.join(temp, 'assets.json')
+    assets = (ctx.read_json(assets_json) if ctx else read_json(assets_json))['objects']
     def cache_asset(file):
         if file in assets:
             asset = assets[file]
-            file = os.path.join(TEMP_DIR, 'cache/assets', asset['hash'])
-            if not hash_test(asset['hash'], file):
-                safe_del(file)
-                make_dirname(file)
-                urlretrieve(asset['url'], file)
-            return file
+            return fetch_asset_object(asset['url'], asset['hash'])
         return None
     
     with open(cache_asset(file), 'rb') as f:
@@ -567,12 +1043,18 @@ def strip_list(lst: list):
     while lst and not lst[-1]:
         lst.pop(-1)
 
-def _get_sub_folders(temp, subdir, exlude=[]) -> tuple[list[str], list[str]]:
-    if os.path.exists(os.path.join(temp, subdir, 'minecraft')):
-        rslt_namespaces = [flatering(d).strip('/') for d in glob.iglob('*/', root_dir=os.path.join(temp, subdir), recursive=False)]
+def _get_sub_folders(temp, subdir, exlude=[], index: TreeIndex=None) -> tuple[list[str], list[str]]:
+    exists = index.exists if index else os.path.exists
+    def subdirs(path):
+        if index:
+            return index.subdirs(path)
+        return glob.iglob('*/', root_dir=path, recursive=False)
+    
+    if exists(os.path.join(temp, subdir, 'minecraft')):
+        rslt_namespaces = [flatering(d).strip('/') for d in subdirs(os.path.join(temp, subdir))]
         rslt_dirs = set()
         for ns in rslt_namespaces:
-            rslt_dirs.update([flatering(d).strip('/') for d in glob.iglob('*/', root_dir=os.path.join(temp, subdir, ns), recursive=False)])
+            rslt_dirs.update([flatering(d).strip('/') for d in subdirs(os.path.join(temp, subdir, ns))])
         
         rslt_dirs = list(sorted(rslt_dirs.difference(exlude)))
     else:
@@ -581,7 +1063,7 @@ def _get_sub_folders(temp, subdir, exlude=[]) -> tuple[list[str], list[str]]:
     
     return rslt_namespaces, rslt_dirs
 
-def get_sub_folders_assets(temp) -> tuple[list[str], list[str]]:
+def get_sub_folders_assets(temp, index: TreeIndex=None) -> tuple[list[str], list[str]]:
     lst_exlude = [
         'structures.snbt',
         'advancements',
@@ -589,9 +1071,9 @@ def get_sub_folders_assets(temp) -> tuple[list[str], list[str]]:
         'loot_tables',
         'shaders',
     ]
-    return _get_sub_folders(temp, 'assets', lst_exlude)
+    return _get_sub_folders(temp, 'assets', lst_exlude, index)
 
-def get_sub_folders_data(temp) -> tuple[list[str], list[str]]:
+def get_sub_folders_data(temp, index: TreeIndex=None) -> tuple[list[str], list[str]]:
     lst_exlude = [
         'structures.snbt',
         'advancements',
@@ -604,24 +1086,38 @@ def get_sub_folders_data(temp) -> tuple[list[str], list[str]]:
         'tags',
         'worldgen',
     ]
-    return _get_sub_folders(temp, 'data', lst_exlude)
+    return _get_sub_folders(temp, 'data', lst_exlude, index)
 
 def uniform_reports(temp):
+    from common import iter_json_object, peek_text, write_json_object
+    
     do_uniform = False
     
+    def sorted_components(items):
+        for k,v in items:
+            if 'components' in v and isinstance(v['components'], list):
+                v['components'] = list(sorted(v['components'], key=lambda x: x['type']))
+            yield k,v
+    
     items_json = os.path.join(temp, 'reports/items.json')
-    if os.path.exists(items_json) and '"components": [' in read_text(items_json):
-        j = read_json(items_json)
-        for k in j.keys():
-            if 'components' in j[k] and isinstance(j[k]['components'], list):
-                j[k]['components'] = list(sorted(j[k]['components'], key=lambda x: x['type']))
-        write_json(items_json, j)
+    # the list format of the components is visible on the first item
+    if os.path.exists(items_json) and '"components": [' in peek_text(items_json):
+        write_json_object(items_json+'.tmp', sorted_components(iter_json_object(items_json)))
+        os.replace(items_json+'.tmp', items_json)
         do_uniform = True
     
+    def uniform_newlines(path):
+        with open(path, 'rb') as f:
+            if not any(b'\r' in chunk for chunk in iter(lambda: f.read(1024*1024), b'')):
+                return
+        import shutil
+        with open(path, 'rt', encoding='utf-8') as src, open(path+'.tmp', 'wt', newline='\n', encoding='utf-8') as dst:
+            shutil.copyfileobj(src, dst, 1024*1024)
+        os.replace(path+'.tmp', path)
+    
     if do_uniform:
         for j in glob.iglob('reports/*.json', root_dir=temp, recursive=False):
-            j = os.path.join(temp, j)
-            write_text(j, read_text(j))
+            uniform_newlines(os.path.join(temp, j))
 
 
 def mcrange(name, entry, limit=None):
@@ -957,16 +1453,16 @@ def lootcomment(name, entry):
     return ', '.join(comment)
 
 
-def listing_builtit_datapacks(temp):
-    lines = [namespace(os.path.basename(dp.strip('\\/'))) for dp in get_datapack_paths(temp)[1:]]
+def listing_builtit_datapacks(temp, ctx: ListingContext):
+    lines = [namespace(os.path.basename(dp.strip('\\/'))) for dp in get_datapack_paths(temp, ctx.index)[1:]]
     if lines:
         write_lines(os.path.join(temp, 'lists', 'datapacks.txt'), sorted(lines))
 
-def listing_structures(temp):
-    dir = get_structures_dir(temp)
+def listing_structures(temp, ctx: ListingContext):
+    dir = get_structures_dir(temp, ctx.index)
     lines = set()
-    for dp in get_datapack_paths(temp):
-        lines.update([namespace(filename(j)) for j in glob.iglob('**/*.nbt', root_dir=os.path.join(temp, dir, dp), recursive=True)])
+    for dp in get_datapack_paths(temp, ctx.index):
+        lines.update([namespace(filename(j)) for j in ctx.index.iglob(os.path.join(temp, dir, dp), '.nbt')])
     if lines:
         write_lines(os.path.join(temp, 'lists', os.path.basename(dir)+'.nbt.txt'), sorted(lines))
 
@@ -1027,24 +1523,24 @@ class Advancement():
         self.announce_to_chat = display.get('announce_to_chat', True)
         self.hidden = display.get('hidden', False)
 
-def listing_advancements(temp):
+def listing_advancements(temp, ctx: ListingContext):
     dir = match_dir(temp, [
         'data/minecraft/advancement',
         'data/minecraft/advancements', # old
         'assets/minecraft/advancements', # legacy
-    ])
+    ], ctx.index)
     
-    lst_namespace, _dirs = get_sub_folders_data(temp)
+    lst_namespace, _dirs = get_sub_folders_data(temp, ctx.index)
     entries = set()
     tags = set()
-    entries.update(enum_json(os.path.join(temp, 'assets/minecraft/advancements')))
+    entries.update(enum_json(os.path.join(temp, 'assets/minecraft/advancements'), index=ctx.index))
     for ns in lst_namespace:
-        for dp in get_datapack_paths(temp):
-            entries.update(enum_json(os.path.join(temp, dp, 'data', ns, 'advancement'), ns=ns))
-            tags.update(enum_json(os.path.join(temp, dp, 'data', ns, 'tags/advancement'), ns=ns, is_tag=True))
+        for dp in get_datapack_paths(temp, ctx.index):
+            entries.update(enum_json(os.path.join(temp, dp, 'data', ns, 'advancement'), ns=ns, index=ctx.index))
+            tags.update(enum_json(os.path.join(temp, dp, 'data', ns, 'tags/advancement'), ns=ns, is_tag=True, index=ctx.index))
             # legacy
-            entries.update(enum_json(os.path.join(temp, dp, 'data', ns, 'advancements'), ns=ns))
-            tags.update(enum_json(os.path.join(temp, dp, 'data', ns, 'tags/advancements'), ns=ns, is_tag=True))
+            entries.update(enum_json(os.path.join(temp, dp, 'data', ns, 'advancements'), ns=ns, index=ctx.index))
+            tags.update(enum_json(os.path.join(temp, dp, 'data', ns, 'tags/advancements'), ns=ns, is_tag=True, index=ctx.index))
     
     recipes = set(e for e in entries if ':recipes/' in e)
     entries.difference_update(recipes)
@@ -1058,10 +1554,10 @@ def listing_advancements(temp):
     
     entries: dict[str, Advancement] = {}
     tree_child = defaultdict(set)
-    for dp in get_datapack_paths(temp):
+    for dp in get_datapack_paths(temp, ctx.index):
         root_dir = os.path.join(temp, dp, dir)
-        for j in glob.iglob('**/*.json', root_dir=root_dir, recursive=True):
-            advc = Advancement(j, read_json(os.path.join(root_dir, j)))
+        for j in ctx.index.iglob(root_dir, '.json'):
+            advc = Advancement(j, ctx.read_json(os.path.join(root_dir, j)))
             if advc.path.startswith('recipes/'):
                 continue
             entries[advc.full_name] = advc
@@ -1075,7 +1571,7 @@ def listing_advancements(temp):
     indent_child = '└>'
     indent_space = '  '
     
-    languages_json = get_languages_json(temp)
+    languages_json = ctx.languages_json()
     
     for k in tree_child.keys():
         tree_child[k] = list(sorted(tree_child[k]))
@@ -1127,7 +1623,7 @@ def listing_advancements(temp):
     if tree:
         write_json(os.path.join(temp, 'lists', os.path.basename(dir)+'.tree.json'), tree)
 
-def listing_subdir_reports(temp):
+def listing_subdir_reports(temp, ctx: ListingContext):
     # subdir /reports/
     lst_subdir = [
         'dimension',
@@ -1143,57 +1639,29 @@ def listing_subdir_reports(temp):
             'reports/'+ subdir, # alt root
             'reports/minecraft/'+ subdir, # old
             'reports/worldgen/minecraft/'+ subdir, # legacy
-        ])
+        ], ctx.index)
         
-        lines.update(enum_json(os.path.join(temp, dir)))
+        lines.update(enum_json(os.path.join(temp, dir), index=ctx.index))
         if lines:
             write_lines(os.path.join(temp, 'lists', subdir+'.txt'), sorted(lines))
 
-def listing_special_subdirs(temp):
+def listing_special_subdirs(temp, ctx: ListingContext):
     # special subdir (not in registries)
-    lst_namespace, lst_subdir = get_sub_folders_data(temp)
+    lst_namespace, lst_subdir = get_sub_folders_data(temp, ctx.index)
     
     for subdir in lst_subdir:
         entries = set()
         tags = set()
         for ns in lst_namespace:
-            for dp in get_datapack_paths(temp):
-                entries.update(enum_json(os.path.join(temp, dp, 'data', ns,         subdir), ns=ns))
-                tags.update(   enum_json(os.path.join(temp, dp, 'data', ns, 'tags', subdir), ns=ns, is_tag=True))
+            for dp in get_datapack_paths(temp, ctx.index):
+                entries.update(enum_json(os.path.join(temp, dp, 'data', ns,         subdir), ns=ns, index=ctx.index))
+                tags.update(   enum_json(os.path.join(temp, dp, 'data', ns, 'tags', subdir), ns=ns, is_tag=True, index=ctx.index))
         lines = sorted(entries) + sorted(tags)
         if lines:
             write_lines(os.path.join(temp, 'lists', subdir+'.txt'), lines)
 
-def listing_loot_tables(temp):
-    
-    dir = match_dir(temp, [
-        'data/minecraft/loot_table',
-        'data/minecraft/loot_tables', # old
-        'assets/minecraft/loot_tables', # legacy
-    ])
-    
-    lst_namespace, _dirs = get_sub_folders_data(temp)
-    entries = set()
-    tags = set()
-    entries.update(enum_json(os.path.join(temp, 'assets/minecraft/loot_tables')))
-    for ns in lst_namespace:
-        for dp in get_datapack_paths(temp):
-            entries.update(enum_json(os.path.join(temp, dp, 'data', ns, 'loot_table'), ns=ns))
-            tags.update(enum_json(os.path.join(temp, dp, 'data', ns, 'tags/loot_table'), ns=ns, is_tag=True))
-            # legacy
-            entries.update(enum_json(os.path.join(temp, dp, 'data', ns, 'loot_tables'), ns=ns))
-            tags.update(enum_json(os.path.join(temp, dp, 'data', ns, 'tags/loot_tables'), ns=ns, is_tag=True))
-    
-    entries.discard('minecraft:empty')
-    blocks = set(e for e in entries if ':blocks/' in e)
-    entries.difference_update(blocks)
-    tags_blocks = set(e for e in tags if ':blocks/' in e)
-    tags.difference_update(tags_blocks)
-    
-    if entries:
-        write_lines(os.path.join(temp, 'lists', os.path.basename(dir)+'.txt'), sorted(entries) + sorted(tags))
-    if blocks:
-        write_lines(os.path.join(temp, 'lists', os.path.basename(dir)+'.blocks.txt'), sorted(blocks) + sorted(tags_blocks))
+def loot_table_pools(name, table) -> list[TBLpool]:
+    """Build the pools of a loot table, with the weight groupes and the alternatives flattened."""
     
     def get_simple(name, entry):
         def convert(item):
@@ -1278,7 +1746,7 @@ def listing_loot_tables(temp):
         tbl_pool.append(tbl_entrie)
         
         if tbl_entrie.name == '{}alternatives':
-            alternatives_groupe = len(tbl_pool.all_alternatives_groupes())+1
+            alternatives_groupe = len(tbl_pool.alternatives_groupes)+1
             tbl_entrie.name = '{'+str(alternatives_groupe)+'}alternatives'
             tbl_entrie.count = ''
             for c in e['children']:
@@ -1288,7 +1756,7 @@ def listing_loot_tables(temp):
         if tbl_entrie.name == 'loot_table[]':
             tbl_entrie.count = get_rolls(pool)
             tbl_entrie.comment = get_poolcomment(pool)
-            weight_groupe = len(tbl_pool.all_weight_groupes())
+            weight_groupe = len(tbl_pool.weight_totals)
             sub_table = e.get('value') or e['name']
             for sub_pool in sub_table.get('pools', {}):
                 iter_pool(tbl_pool, sub_pool, weight_groupe)
@@ -1309,107 +1777,143 @@ def listing_loot_tables(temp):
         else:
             raise ValueError('listing_loot_tables(): Invalid input pool.')
     
-    for dp in get_datapack_paths(temp):
-        for loot in glob.iglob('**/*.json', root_dir=os.path.join(temp, dp, dir), recursive=True):
+    rslt_tbl :list[TBLpool] = []
+    for pool in table.get('pools', {}):
+        tbl_pool = TBLpool()
+        tbl_pool.rolls = get_rolls(pool)
+        tbl_pool.comment = get_poolcomment(pool)
+        
+        rslt_tbl.append(tbl_pool)
+        
+        weight_groupe = len(tbl_pool.weight_totals)
+        iter_pool(tbl_pool, pool, weight_groupe)
+    return rslt_tbl
+
+def loot_tables_pools(tables) -> dict[str, list[TBLpool]]:
+    """Batch of loot_table_pools() for a list of (name, table)."""
+    return {name:loot_table_pools(name, table) for name, table in tables}
+
+def listing_loot_tables(temp, ctx: ListingContext):
+    
+    dir = match_dir(temp, [
+        'data/minecraft/loot_table',
+        'data/minecraft/loot_tables', # old
+        'assets/minecraft/loot_tables', # legacy
+    ], ctx.index)
+    
+    lst_namespace, _dirs = get_sub_folders_data(temp, ctx.index)
+    entries = set()
+    tags = set()
+    entries.update(enum_json(os.path.join(temp, 'assets/minecraft/loot_tables'), index=ctx.index))
+    for ns in lst_namespace:
+        for dp in get_datapack_paths(temp, ctx.index):
+            entries.update(enum_json(os.path.join(temp, dp, 'data', ns, 'loot_table'), ns=ns, index=ctx.index))
+            tags.update(enum_json(os.path.join(temp, dp, 'data', ns, 'tags/loot_table'), ns=ns, is_tag=True, index=ctx.index))
+            # legacy
+            entries.update(enum_json(os.path.join(temp, dp, 'data', ns, 'loot_tables'), ns=ns, index=ctx.index))
+            tags.update(enum_json(os.path.join(temp, dp, 'data', ns, 'tags/loot_tables'), ns=ns, is_tag=True, index=ctx.index))
+    
+    entries.discard('minecraft:empty')
+    blocks = set(e for e in entries if ':blocks/' in e)
+    entries.difference_update(blocks)
+    tags_blocks = set(e for e in tags if ':blocks/' in e)
+    tags.difference_update(tags_blocks)
+    
+    if entries:
+        write_lines(os.path.join(temp, 'lists', os.path.basename(dir)+'.txt'), sorted(entries) + sorted(tags))
+    if blocks:
+        write_lines(os.path.join(temp, 'lists', os.path.basename(dir)+'.blocks.txt'), sorted(blocks) + sorted(tags_blocks))
+    
+    tables = []
+    for dp in get_datapack_paths(temp, ctx.index):
+        for loot in ctx.index.iglob(os.path.join(temp, dp, dir), '.json'):
             if loot == 'empty.json':
                 continue
-            table = read_json(os.path.join(temp, dp, dir, loot))
             name = filename(loot)
-            
-            rslt_tbl :list[TBLpool] = []
-            
             if name.startswith('blocks'):
                 continue
-            else:
-                for pool in table.get('pools', {}):
-                    tbl_pool = TBLpool()
-                    tbl_pool.rolls = get_rolls(pool)
-                    tbl_pool.comment = get_poolcomment(pool)
-                    
-                    rslt_tbl.append(tbl_pool)
-                    
-                    weight_groupe = len(tbl_pool.all_weight_groupes())
-                    iter_pool(tbl_pool, pool, weight_groupe)
+            tables.append((name, ctx.read_json(os.path.join(temp, dp, dir, loot), cache=False)))
+    
+    for name, rslt_tbl in loot_tables_pools(tables).items():
+        lines_txt = []
+        lines_tbl = []
+        
+        head_tbl = ['Name', 'Count', 'Chance', 'Weight', 'Comment']
+        for r in rslt_tbl:
+            lines_tbl.append([r.rolls,'--','--','--',r.comment])
             
-            lines_txt = []
-            lines_tbl = []
+            use_weight_groupe = len(r.weight_totals) > 1
             
-            head_tbl = ['Name', 'Count', 'Chance', 'Weight', 'Comment']
-            for r in rslt_tbl:
-                lines_tbl.append([r.rolls,'--','--','--',r.comment])
+            for e, p in zip(r.entries, r.probabilities()):
+                c = None if p is None else (p.numerator/p.denominator)*100
                 
-                use_weight_groupe = len(r.all_weight_groupes()) > 1
-                
-                for e in r.entries:
-                    c = e.chance
-                    
-                    if c is None:
-                        c = ''
-                    elif c < 1:
-                        c = str(round(c, 2))+'%'
-                    else:
-                        c = no_end_0(round(c, 1))+'%'
-                    
-                    if use_weight_groupe or e.alternatives_groupe:
-                        groupe = ' '.join([
-                            ('{'+str(e.alternatives_groupe)+'}') if e.alternatives_groupe else '',
-                            ('['+str(e.weight_groupe+1)+']') if use_weight_groupe else '',
-                        ]).strip()
-                        prefix, suffix = groupe+' ',' '+groupe
-                    else:
-                        prefix, suffix = '',''
-                    lines_txt.append(prefix+e.name)
-                    lines_tbl.append([
-                        prefix+e.name,
-                        e.count + (suffix if e.count else ''),
-                        c + (suffix if c else ''),
-                        e.propabilty + (suffix if e.propabilty else ''),
-                        e.comment,
-                    ])
+                if c is None:
+                    c = ''
+                elif c < 1:
+                    c = str(round(c, 2))+'%'
+                else:
+                    c = no_end_0(round(c, 1))+'%'
                 
-                lines_txt.append('')
-                lines_tbl.append(None)
-            
-            strip_list(lines_txt)
-            if not lines_txt:
-                lines_txt.append('empty')
-            write_lines(os.path.join(temp, 'lists/loot_tables', name+'.txt'), lines_txt)
-            
-            
-            strip_list(lines_tbl)
-            if not lines_tbl:
-                lines_tbl.append(['empty','','100%','1',''])
-            
-            for i in range(len(lines_tbl)):
-                if lines_tbl[i]:
-                    for y in range(len(lines_tbl[i])):
-                        d = str(lines_tbl[i][y])
-                        if d:
-                            lines_tbl[i][y] = no_end_0(d)
+                if use_weight_groupe or e.alternatives_groupe:
+                    groupe = ' '.join([
+                        ('{'+str(e.alternatives_groupe)+'}') if e.alternatives_groupe else '',
+                        ('['+str(e.weight_groupe+1)+']') if use_weight_groupe else '',
+                    ]).strip()
+                    prefix, suffix = groupe+' ',' '+groupe
+                else:
+                    prefix, suffix = '',''
+                lines_txt.append(prefix+e.name)
+                lines_tbl.append([
+                    prefix+e.name,
+                    e.count + (suffix if e.count else ''),
+                    c + (suffix if c else ''),
+                    e.propabilty + (suffix if e.propabilty else ''),
+                    e.comment,
+                ])
             
-            write_tbl_csv(os.path.join(temp, 'lists/loot_tables', name+'.csv'), head_tbl, lines_tbl)
-            write_tbl_md(os.path.join(temp, 'lists/loot_tables', name+'.md'), head_tbl, lines_tbl)
+            lines_txt.append('')
+            lines_tbl.append(None)
+        
+        strip_list(lines_txt)
+        if not lines_txt:
+            lines_txt.append('empty')
+        write_lines(os.path.join(temp, 'lists/loot_tables', name+'.txt'), lines_txt)
+        
+        
+        strip_list(lines_tbl)
+        if not lines_tbl:
+            lines_tbl.append(['empty','','100%','1',''])
+        
+        for i in range(len(lines_tbl)):
+            if lines_tbl[i]:
+                for y in range(len(lines_tbl[i])):
+                    d = str(lines_tbl[i][y])
+                    if d:
+                        lines_tbl[i][y] = no_end_0(d)
+        
+        write_tbl_csv(os.path.join(temp, 'lists/loot_tables', name+'.csv'), head_tbl, lines_tbl)
+        write_tbl_md(os.path.join(temp, 'lists/loot_tables', name+'.md'), head_tbl, lines_tbl)
 
-def listing_worldgens(temp):
+def listing_worldgens(temp, ctx: ListingContext):
     dir = match_dir(temp, [
         'data/minecraft/worldgen',
         'reports/minecraft/worldgen', # old
         'reports/worldgen/minecraft/worldgen', # legacy
-    ])
+    ], ctx.index)
     
     lines = set()
-    for dp in get_datapack_paths(temp):
+    for dp in get_datapack_paths(temp, ctx.index):
         world_preset_dir = os.path.join(temp, dir, dp, 'world_preset')
-        for j in glob.iglob('**/*.json', root_dir=world_preset_dir, recursive=True):
-            lines.update([namespace(e) for e in read_json(os.path.join(world_preset_dir, j)).get('dimensions', {}).keys()])
+        for j in ctx.index.iglob(world_preset_dir, '.json'):
+            lines.update([namespace(e) for e in ctx.read_json(os.path.join(world_preset_dir, j)).get('dimensions', {}).keys()])
     
     if lines:
         write_lines(os.path.join(temp, 'lists', 'dimension.txt'), sorted(lines))
     
     def biomes_list(dir):
         no_features = False
-        for path in glob.iglob('**/*.json', root_dir=dir, recursive=True):
-            j = read_json(os.path.join(dir, path))
+        for path in ctx.index.iglob(dir, '.json'):
+            j = ctx.read_json(os.path.join(dir, path))
             path = filename(path)
             
             lines = []
@@ -1449,6 +1953,7 @@ def listing_worldgens(temp):
             if lines is None or no_features:
                 no_features = True
                 path = os.path.join(temp, 'lists/worldgen/biome/features')
+                flush_output()
                 if os.path.exists(path):
                     import shutil
                     shutil.rmtree(path)
@@ -1459,22 +1964,68 @@ def listing_worldgens(temp):
                 
                 write_lines(os.path.join(temp, 'lists/worldgen/biome/features', path+'.txt'), lines)
     
-    for subdir in glob.iglob('*/', root_dir=os.path.join(temp, dir), recursive=False):
-        subdir = subdir.strip('/\\')
+    for subdir in ctx.index.subdirs(os.path.join(temp, dir)):
         entries = set()
         tags = set()
-        for dp in get_datapack_paths(temp):
-            entries.update(enum_json(os.path.join(temp, dp, dir,                            subdir)))
-            tags.update(   enum_json(os.path.join(temp, dp, 'data/minecraft/tags/worldgen', subdir), is_tag=True))
+        for dp in get_datapack_paths(temp, ctx.index):
+            entries.update(enum_json(os.path.join(temp, dp, dir,                            subdir), index=ctx.index))
+            tags.update(   enum_json(os.path.join(temp, dp, 'data/minecraft/tags/worldgen', subdir), is_tag=True, index=ctx.index))
             biomes_list(os.path.join(temp, dp, dir, 'biome'))
         write_lines(os.path.join(temp, 'lists/worldgen', subdir +'.txt'), sorted(entries) + sorted(tags))
     
     dir = os.path.join(temp, 'reports/biomes') #legacy
-    if os.path.exists(dir):
-        write_lines(os.path.join(temp, 'lists/worldgen', 'biome.txt'), sorted(enum_json(dir)))
+    if ctx.index.exists(dir):
+        write_lines(os.path.join(temp, 'lists/worldgen', 'biome.txt'), sorted(enum_json(dir, index=ctx.index)))
         biomes_list(dir)
 
-def listing_blocks(temp):
+class IdTable():
+    """Interned namespaced IDs, referenced by their integer index."""
+    __slots__ = ('ids', '_indexes')
+    
+    def __init__(self):
+        self.ids :list[str] = []
+        self._indexes :dict[str, int] = {}
+    
+    def index(self, id) -> int:
+        idx = self._indexes.get(id)
+        if idx is None:
+            import sys
+            idx = len(self.ids)
+            id = sys.intern(id)
+            self.ids.append(id)
+            self._indexes[id] = idx
+        return idx
+    
+    def sorted(self, indexes) -> list[str]:
+        return sorted(set(self.ids[i] for i in indexes))
+
+class PropertyTable():
+    """
+    Fan-out property -> value -> IDs.
+    The properties and the values are stored once in integer-indexed tables,
+    and the IDs of each (property, value) in a compact array of IdTable indexes.
+    """
+    __slots__ = ('ids', '_properties', '_values', '_entries')
+    
+    def __init__(self, ids: IdTable):
+        self.ids = ids
+        self._properties = IdTable()
+        self._values = IdTable()
+        self._entries :dict[int, dict[int, array]] = {}
+    
+    def add(self, property, value, id_index: int):
+        values = self._entries.setdefault(self._properties.index(property), {})
+        v = self._values.index(value)
+        if v not in values:
+            values[v] = array('I')
+        values[v].append(id_index)
+    
+    def items(self):
+        """Iterate over (property, {value: sorted IDs})"""
+        for p,values in self._entries.items():
+            yield self._properties.ids[p], {self._values.ids[v]:self.ids.sorted(idx) for v,idx in values.items()}
+
+def listing_blocks(temp, ctx: ListingContext):
     def mcrange(name, entry):
         type_name = flat_type(entry)
         match type_name:
@@ -1518,14 +2069,19 @@ def listing_blocks(temp):
             case _:
                 raise value_error
     
-    blockstates = defaultdict(lambda:defaultdict(set))
+    import sys
+    from common import iter_json_object
+    
+    ids = IdTable()
+    blockstates = PropertyTable(ids)
     definitions = defaultdict(dict)
     
-    rj = read_json(os.path.join(temp, 'reports/blocks.json'))
-    if rj:
-        write_lines(os.path.join(temp, 'lists', 'block.txt'), sorted(rj.keys()))
-    for name,content in rj.items():
+    blocks_json = os.path.join(temp, 'reports/blocks.json')
+    names = []
+    for name,content in iter_json_object(blocks_json) if ctx.index.exists(blocks_json) else []:
+        names.append(name)
         name = flatering(name)
+        id_index = ids.index(namespace(name))
         lines = []
         for bs in content.pop('states', []):
             properties = bs.get('properties', {})
@@ -1541,21 +2097,26 @@ def listing_blocks(temp):
                 case 'properties':
                     for k,v in content_value.items():
                         for vv in v:
-                            blockstates[k][vv].add(namespace(name))
+                            blockstates.add(k, vv, id_index)
                 case 'definition':
                     write_json(os.path.join(temp, 'lists/blocks/definition', name+'.json'), content_value, sort_keys=True)
                     for k,v in content_value.items():
                         value = parse_value(name, k, v)
                         if value is not None:
-                            definitions[k][namespace(name)] = value
+                            if isinstance(value, str):
+                                value = sys.intern(value)
+                            definitions[k][ids.ids[id_index]] = value
                 case _:
                     raise ValueError(f'listing_blocks(): Block element {content_type!r} not implemented.')
     
+    if names:
+        write_lines(os.path.join(temp, 'lists', 'block.txt'), sorted(names))
+    
     for k,v in blockstates.items():
         lines = set()
         for kk,vv in v.items():
             lines.update(vv)
-            write_lines(os.path.join(temp, 'lists/blocks/properties', k+'='+kk+'.txt'), sorted(vv))
+            write_lines(os.path.join(temp, 'lists/blocks/properties', k+'='+kk+'.txt'), vv)
         write_lines(os.path.join(temp, 'lists/blocks/properties', k+'.txt'), sorted(lines))
     
     grouped = [
@@ -1598,8 +2159,8 @@ def listing_blocks(temp):
             lines = [f'{kk}  = {vv}' for kk,vv in v.items()]
             write_lines(os.path.join(temp, 'lists/blocks/definition/values', k+'.txt'), sorted(lines))
 
-def write_components_data(temp, output_dir, src_data):
-    languages_json = get_languages_json(temp)
+def write_components_data(temp, ctx: ListingContext, output_dir, src_data):
+    languages_json = ctx.languages_json()
     
     def _one_key_dict(value):
         if len(value) == 1:
@@ -1719,13 +2280,18 @@ def write_components_data(temp, output_dir, src_data):
                 if component_test_value(v, is_file=True) or (name in components_always_json_value and v):
                     write_json(os.path.join(temp, output_dir, name, flatering(n)+'.json'), v)
 
-def listing_items(temp):
+def listing_items(temp, ctx: ListingContext):
+    from common import iter_json_object
+    
+    ids = IdTable()
     itemstates = defaultdict(lambda:defaultdict(dict))
-    rj = read_json(os.path.join(temp, 'reports/items.json'))
-    if rj:
-        write_lines(os.path.join(temp, 'lists', 'item.txt'), sorted(rj.keys()))
-    for k,v in rj.items():
+    items_json = os.path.join(temp, 'reports/items.json')
+    names = []
+    # only the components values are kept of each item
+    for k,v in iter_json_object(items_json) if ctx.index.exists(items_json) else []:
+        names.append(k)
         name = flatering(k)
+        id = ids.ids[ids.index(namespace(k))]
         v.pop('protocol_id', None)
         if v:
             vc = v.get('components', None)
@@ -1738,25 +2304,28 @@ def listing_items(temp):
                 if isinstance(v[vk], list):
                     for vs in v[vk]:
                         type = flatering(vs['type'])
-                        itemstates[vk][type][namespace(k)] = vs['value']
+                        itemstates[vk][type][id] = vs['value']
                 else:
                     for type,value in v[vk].items():
-                        itemstates[vk][flatering(type)][namespace(k)] = value
+                        itemstates[vk][flatering(type)][id] = value
             else:
                 raise ValueError(f'listing_items(): ItemStates {vk!r} not implemented.')
     
+    if names:
+        write_lines(os.path.join(temp, 'lists', 'item.txt'), sorted(names))
+    
     for k,kv in itemstates.items():
         match k:
             case 'components':
-                write_components_data(temp, 'lists/items/components', kv)
+                write_components_data(temp, ctx, 'lists/items/components', kv)
             case _:
                 raise ValueError(f'listing_items(): Unknow item states {k!r}.')
 
-def listing_components(temp):
+def listing_components(temp, ctx: ListingContext):
     dir = match_dir(temp, [
         'data/minecraft/components',
         'reports/minecraft/components',
-    ])
+    ], ctx.index)
     if not dir:
         return
     subtypes = [
@@ -1764,7 +2333,7 @@ def listing_components(temp):
     ]
     lines = set()
     files = defaultdict(list)
-    for f in glob.iglob('**/*.json', root_dir=os.path.join(temp, dir), recursive=True):
+    for f in ctx.index.iglob(os.path.join(temp, dir), '.json'):
         f = filename(f)
         type, name = f.split('/', maxsplit=1)
         if type in subtypes:
@@ -1778,21 +2347,21 @@ def listing_components(temp):
         lines = set()
         data = defaultdict(dict)
         for f in names:
-            for c,v in read_json(os.path.join(temp, dir, type, f+'.json')).get('components', {}).items():
+            for c,v in ctx.read_json(os.path.join(temp, dir, type, f+'.json')).get('components', {}).items():
                 data[flatering(c)][namespace(f)] = v
             lines.add(namespace(f))
         write_lines(os.path.join(temp, 'lists/components', type+'.txt'), sorted(lines))
-        write_components_data(temp, 'lists/components/'+type, data)
+        write_components_data(temp, ctx, 'lists/components/'+type, data)
 
-def listing_packets(temp):
-    for k,tv in read_json(os.path.join(temp, 'reports/packets.json')).items():
+def listing_packets(temp, ctx: ListingContext):
+    for k,tv in ctx.read_json(os.path.join(temp, 'reports/packets.json')).items():
         for t,v in tv.items():
             write_lines(os.path.join(temp, 'lists/packets', k, t+'.txt'), sorted([namespace(e) for e in v.keys()]))
 
-def listing_datapacks(temp):
+def listing_datapacks(temp, ctx: ListingContext):
     values = defaultdict(set)
     
-    for k,tv in read_json(os.path.join(temp, 'reports/datapack.json')).items():
+    for k,tv in ctx.read_json(os.path.join(temp, 'reports/datapack.json')).items():
         for t,v in tv.items():
             t = namespace(t)
             values['all'].add(t)
@@ -1810,7 +2379,7 @@ def listing_datapacks(temp):
     for k,v in values.items():
         write_lines(os.path.join(temp, 'lists/datapacks', k)+'.txt', sorted(v))
 
-def listing_commands(temp):
+def listing_commands(temp, ctx: ListingContext):
     argument_type = set()
     
     def get_argument(value, entry):
@@ -1887,7 +2456,7 @@ def listing_commands(temp):
         
         return rslt
     
-    src_json = read_json(os.path.join(temp, 'reports/commands.json'))
+    src_json = ctx.read_json(os.path.join(temp, 'reports/commands.json'))
     base_level = None
     prefix_level = None
     for v in src_json.get('children', {}).values():
@@ -1915,14 +2484,15 @@ def listing_commands(temp):
     if argument_type:
         write_lines(os.path.join(temp, 'lists', 'command_argument_type.txt'), sorted(argument_type))
 
-def listing_registries(temp):
-    lines = [namespace(k) for k in read_json(os.path.join(temp, 'reports/registries.json')).keys()]
+def listing_registries(temp, ctx: ListingContext):
+    registries = ctx.read_json(os.path.join(temp, 'reports/registries.json'))
+    lines = [namespace(k) for k in registries.keys()]
     if lines:
         write_lines(os.path.join(temp, 'lists', 'registries.txt'), sorted(lines))
     
-    lst_namespace, _dirs = get_sub_folders_data(temp)
+    lst_namespace, _dirs = get_sub_folders_data(temp, ctx.index)
     
-    for k,v in read_json(os.path.join(temp, 'reports/registries.json')).items():
+    for k,v in registries.items():
         name = flatering(k)
         
         entries = set()
@@ -1930,27 +2500,27 @@ def listing_registries(temp):
         entries.update([namespace(k) for k in v['entries'].keys()])
         
         for ns in lst_namespace:
-            for dp in get_datapack_paths(temp):
-                entries.update(enum_json(os.path.join(temp, dp, 'data', ns,         name), ns=ns))
-                tags.update(   enum_json(os.path.join(temp, dp, 'data', ns, 'tags', name), ns=ns, is_tag=True))
+            for dp in get_datapack_paths(temp, ctx.index):
+                entries.update(enum_json(os.path.join(temp, dp, 'data', ns,         name), ns=ns, index=ctx.index))
+                tags.update(   enum_json(os.path.join(temp, dp, 'data', ns, 'tags', name), ns=ns, is_tag=True, index=ctx.index))
                 # legacy
-                entries.update(enum_json(os.path.join(temp, dp, 'data', ns,         name+'s'), ns=ns))
-                tags.update(   enum_json(os.path.join(temp, dp, 'data', ns, 'tags', name+'s'), ns=ns, is_tag=True))
+                entries.update(enum_json(os.path.join(temp, dp, 'data', ns,         name+'s'), ns=ns, index=ctx.index))
+                tags.update(   enum_json(os.path.join(temp, dp, 'data', ns, 'tags', name+'s'), ns=ns, is_tag=True, index=ctx.index))
         
         write_lines(os.path.join(temp, 'lists', name +'.txt'), sorted(entries) + sorted(tags))
 
-def listing_paintings(temp):
-    languages_json = get_languages_json(temp)
-    lst_namespace, _dirs = get_sub_folders_data(temp)
+def listing_paintings(temp, ctx: ListingContext):
+    languages_json = ctx.languages_json()
+    lst_namespace, _dirs = get_sub_folders_data(temp, ctx.index)
     paintings = defaultdict(lambda:defaultdict(set))
     for ns in lst_namespace:
-        for dp in get_datapack_paths(temp):
+        for dp in get_datapack_paths(temp, ctx.index):
             dir = os.path.join(temp, dp, 'data', ns, 'painting_variant')
-            for file in glob.iglob('**/*.json', root_dir=dir, recursive=True):
+            for file in ctx.index.iglob(dir, '.json'):
                 name = filename(file)
                 ns_name = namespace(name, ns=ns)
                 lng_id = '.'.join(['painting', ns, name])
-                j = read_json(os.path.join(dir, file))
+                j = ctx.read_json(os.path.join(dir, file))
                 title = parse_json_text(j.get('title'), languages_json) or languages_json.get(lng_id+'.title') or lng_id+'.title'
                 author = parse_json_text(j.get('author'), languages_json) or languages_json.get(lng_id+'.author') or lng_id+'.author'
                 size = '{}x{}'.format(j['width'], j['height'])
@@ -1967,20 +2537,20 @@ def listing_paintings(temp):
         for kk,vv in v.items():
             write_lines(os.path.join(temp, 'lists/paintings', k, kk)+'.txt', sorted(vv))
 
-def listing_jukebox_songs(temp):
-    languages_json = get_languages_json(temp)
-    lst_namespace, _dirs = get_sub_folders_data(temp)
+def listing_jukebox_songs(temp, ctx: ListingContext):
+    languages_json = ctx.languages_json()
+    lst_namespace, _dirs = get_sub_folders_data(temp, ctx.index)
     jukebox_songs = defaultdict(lambda:defaultdict(set))
     all_names = set()
     
     for ns in lst_namespace:
-        for dp in get_datapack_paths(temp):
+        for dp in get_datapack_paths(temp, ctx.index):
             dir = os.path.join(temp, dp, 'data', ns, 'jukebox_song')
-            for file in glob.iglob('**/*.json', root_dir=dir, recursive=True):
+            for file in ctx.index.iglob(dir, '.json'):
                 name = filename(file)
                 ns_name = namespace(name, ns=ns)
                 lng_id = '.'.join(['jukebox_song', ns, name])
-                j = read_json(os.path.join(dir, file))
+                j = ctx.read_json(os.path.join(dir, file))
                 desc = parse_json_text(j.get('description'), languages_json) or languages_json.get(lng_id) or lng_id
                 all_names.add(desc)
                 author, _, title = desc.partition(' - ')
@@ -2001,18 +2571,18 @@ def listing_jukebox_songs(temp):
     if all_names:
         write_lines(os.path.join(temp, 'lists/jukebox_songs.names.txt'), sorted(all_names))
 
-def listing_instruments(temp):
-    languages_json = get_languages_json(temp)
-    lst_namespace, _dirs = get_sub_folders_data(temp)
+def listing_instruments(temp, ctx: ListingContext):
+    languages_json = ctx.languages_json()
+    lst_namespace, _dirs = get_sub_folders_data(temp, ctx.index)
     all_names = set()
     
     for ns in lst_namespace:
-        for dp in get_datapack_paths(temp):
+        for dp in get_datapack_paths(temp, ctx.index):
             dir = os.path.join(temp, dp, 'data', ns, 'instrument')
-            for file in glob.iglob('**/*.json', root_dir=dir, recursive=True):
+            for file in ctx.index.iglob(dir, '.json'):
                 name = filename(file)
                 lng_id = '.'.join(['instrument', ns, name])
-                j = read_json(os.path.join(dir, file))
+                j = ctx.read_json(os.path.join(dir, file))
                 desc = parse_json_text(j.get('description'), languages_json) or languages_json.get(lng_id) or lng_id
                 all_names.add(desc)
                 lines = []
@@ -2025,32 +2595,32 @@ def listing_instruments(temp):
     if all_names:
         write_lines(os.path.join(temp, 'lists/instruments.names.txt'), sorted(all_names))
 
-def listing_tags(temp):
+def listing_tags(temp, ctx: ListingContext):
     entries = set()
-    for dp in get_datapack_paths(temp):
+    for dp in get_datapack_paths(temp, ctx.index):
         dir = os.path.join(temp, dp, 'data/minecraft/tags')
-        entries.update(flatering(j) for j in glob.iglob('**/*.json', root_dir=dir, recursive=True))
+        entries.update(flatering(j) for j in ctx.index.iglob(dir, '.json'))
     
     for name in entries:
         lines = []
-        for dp in get_datapack_paths(temp):
+        for dp in get_datapack_paths(temp, ctx.index):
             j = os.path.join(temp, dp, 'data/minecraft/tags', name)
-            for v in read_json(j).get('values', []):
+            for v in ctx.read_json(j).get('values', []):
                 if v not in lines:
                     lines.append(v)
         
         write_lines(os.path.join(temp, 'lists/tags', filename(name)+'.txt'), lines)
 
-def listing_sounds(temp):
+def listing_sounds(temp, ctx: ListingContext):
     full_lines = set()
-    for sounds in ['sounds.json'] + glob.glob('*/sounds.json', root_dir=os.path.join(temp, 'assets'), recursive=False):
+    for sounds in ['sounds.json'] + [os.path.join(d, 'sounds.json') for d in ctx.index.subdirs(os.path.join(temp, 'assets'))]:
         sounds = os.path.join(temp, 'assets', sounds)
-        if os.path.exists(sounds):
-            for k,v in read_json(sounds).items():
+        if ctx.index.exists(sounds):
+            for k,v in ctx.read_json(sounds).items():
                 name = flatering(k)
                 write_json(os.path.join(temp, 'lists/sounds', name+'.json'), v)
                 
-                lines = v['sounds']
+                lines = list(v['sounds'])
                 for idx,v in enumerate(lines):
                     if isinstance(v, dict):
                         lines[idx] = v['name']
@@ -2061,15 +2631,15 @@ def listing_sounds(temp):
     if full_lines:
         write_lines(os.path.join(temp, 'lists', 'sounds.ogg.txt'), sorted(full_lines))
 
-def listing_musics(temp):
-    languages_json = get_languages_json(temp)
+def listing_musics(temp, ctx: ListingContext):
+    languages_json = ctx.languages_json()
     musics = defaultdict(lambda:defaultdict(set))
     all_events = defaultdict(set)
     sound_events = defaultdict(list)
     musics['sound_events'] = defaultdict(list)
     all_names = set()
     
-    for k,v in read_json(os.path.join(temp, 'assets/minecraft', 'sounds.json')).items():
+    for k,v in ctx.read_json(os.path.join(temp, 'assets/minecraft', 'sounds.json')).items():
         if k.startswith('music.'):
             for n in v.get('sounds', []):
                 if isinstance(n, dict):
@@ -2096,7 +2666,7 @@ def listing_musics(temp):
             lines.append('assets: '+ ns_name)
             lines.append('title: '+ title)
             lines.append('author: '+ author)
-            lines.append('length: '+ human_duration_from_assets(temp, ogg_file))
+            lines.append('length: '+ human_duration_from_assets(temp, ogg_file, ctx))
             if not events:
                 lines.append('sound_event:')
             else:
@@ -2115,19 +2685,19 @@ def listing_musics(temp):
     if all_names:
         write_lines(os.path.join(temp, 'lists/musics.names.txt'), sorted(all_names))
 
-def listing_languages(temp):
+def listing_languages(temp, ctx: ListingContext):
     src_lang = {}
     search_term = ['language.code', 'language.name', 'language.region']
-    for lang in glob.iglob('assets/lang/*.lang', root_dir=temp, recursive=False):
+    for lang in ctx.index.iglob(os.path.join(temp, 'assets/lang'), '.lang', recursive=False):
         # old format
-        lang = parse_languages_lang(os.path.join(temp, lang))
+        lang = parse_languages_lang(os.path.join(temp, 'assets/lang', lang))
         new_lang = {st:lang[st] for st in search_term if st in lang}
         if len(search_term) == len(new_lang):
             src_lang[new_lang['language.code']] = {'region':new_lang['language.region'],'name':new_lang['language.name']}
     
     pack_mcmeta = os.path.join(temp, 'assets', 'pack.mcmeta')
     if not src_lang:
-        src_lang = read_json(pack_mcmeta).get('language', None)
+        src_lang = ctx.read_json(pack_mcmeta, cache=False).get('language', None)
     
     if src_lang:
         # actual format
@@ -2140,8 +2710,8 @@ def listing_languages(temp):
     
     safe_del(pack_mcmeta)
 
-def listing_assets(temp):
-    lst_namespace, lst_subdir = get_sub_folders_assets(temp)
+def listing_assets(temp, ctx: ListingContext):
+    lst_namespace, lst_subdir = get_sub_folders_assets(temp, ctx.index)
     
     lst_ext = ['json', 'txt', 'png']
     
@@ -2149,10 +2719,10 @@ def listing_assets(temp):
         rslt = []
         for ns in lst_namespace:
             root = os.path.join(temp, 'assets', ns, dir)
-            for f in glob.iglob('**/*.'+ext, root_dir=root, recursive=True):
+            for f in ctx.index.iglob(root, '.'+ext):
                 n = namespace(filename(f), ns=ns)
                 if ext == 'png':
-                    if os.path.exists(os.path.join(root, f +'.mcmeta')):
+                    if ctx.index.exists(os.path.join(root, f +'.mcmeta')):
                         n = n+ '  [mcmeta]'
                 rslt.append(n)
         return rslt
@@ -2166,9 +2736,7 @@ def listing_assets(temp):
     
     lines = {}
     shaders_dir = os.path.join(temp, 'assets', 'shaders')
-    for f in glob.iglob('**/*', root_dir=shaders_dir, recursive=True):
-        if os.path.isdir(os.path.join(shaders_dir, f)):
-            continue
+    for f in ctx.index.iglob(shaders_dir):
         name, ext = os.path.splitext(f)
         name = flatering(name)
         ext = ext.strip('.').lower()
@@ -2183,13 +2751,13 @@ def listing_assets(temp):
     if not lst_subdir:
         # old /assets/
         for name, ext in [('textures','png'), ('texts','txt')]:
-            lines = [namespace(filename(f)) for f in glob.iglob('**/*.'+ext, root_dir=os.path.join(temp, 'assets'), recursive=True)]
+            lines = [namespace(filename(f)) for f in ctx.index.iglob(os.path.join(temp, 'assets'), '.'+ext)]
             if lines:
                 txt_path = name + '.'+ext +'.txt'
                 write_lines(os.path.join(temp, 'lists', txt_path), sorted(lines))
 
-def listing_rpc_api_schema(temp):
-    rj = read_json(os.path.join(temp, 'reports/json-rpc-api-schema.json'))
+def listing_rpc_api_schema(temp, ctx: ListingContext):
+    rj = ctx.read_json(os.path.join(temp, 'reports/json-rpc-api-schema.json'), cache=False)
     if not rj:
         return
     lines = [
@@ -2223,7 +2791,7 @@ def listing_rpc_api_schema(temp):
     if rj:
         raise ValueError('rpc_api_schema(): unknow data inside the rpc-api-schema', *(repr(k) for k in rj.keys()))
 
-def listing_timelines(temp):
+def listing_timelines(temp, ctx: ListingContext):
     
     def explore_data(data, width_right, width_left):
         lines_csv = []
@@ -2337,8 +2905,8 @@ def listing_timelines(temp):
         return widths['r'], widths['l'], lines, lines_csv, lines_md
 
     dir = 'data/minecraft/timeline/'
-    for f in glob.iglob('**/*.json', root_dir=os.path.join(temp, dir), recursive=True):
-        data = read_json(os.path.join(temp, dir, f))
+    for f in ctx.index.iglob(os.path.join(temp, dir), '.json'):
+        data = ctx.read_json(os.path.join(temp, dir, f))
         
         width_right, width_left, _, _, _ = explore_data(data, 0, 0)  # iter once for get the collums width
         _, _, lines, lines_csv, lines_md = explore_data(data, width_right, width_left)  # iter second for get the correct lines
@@ -2348,7 +2916,7 @@ def listing_timelines(temp):
         write_lines(os.path.join(temp, 'lists/timelines/', name + '.csv'), lines_csv)
         write_lines(os.path.join(temp, 'lists/timelines/', name + '.md'), lines_md)
 
-def listing_villager_trade(temp):
+def listing_villager_trade(temp, ctx: ListingContext):
     dir = 'data/minecraft/villager_trade/'
     
     def slot(item):
@@ -2372,8 +2940,8 @@ def listing_villager_trade(temp):
         else:
             return f'{name}{components}'
     
-    for f in glob.iglob('**/*.json', root_dir=os.path.join(temp, dir), recursive=True):
-        data = read_json(os.path.join(temp, dir, f))
+    for f in ctx.index.iglob(os.path.join(temp, dir), '.json'):
+        data = ctx.read_json(os.path.join(temp, dir, f), cache=False)
         name = filename(f)
         lines = []
         wants = []
@@ -2404,7 +2972,7 @@ def listing_villager_trade(temp):
         write_lines(os.path.join(temp, 'lists/villager_trade/', name + '.txt'), lines)
 
 
-listing_various_functions: list[Callable[[str], None]] = [
+listing_various_functions: list[Callable[[str, ListingContext], None]] = [
     listing_builtit_datapacks,
     listing_structures,
     listing_advancements,
@@ -2431,11 +2999,274 @@ listing_various_functions: list[Callable[[str], None]] = [
     listing_timelines,
     listing_villager_trade,
 ]
-def listing_various_data(temp):
-    for func in listing_various_functions:
-        func(temp)
 
-def listing_various_data_alt(version, temp):
+# paths inside temp (reads, writes) of each listing function, a path ending by '/' is a full folder
+# a path starting by '!' exclude a part of the others paths
+# two functions that access the same path, and one of them write it, are run in the order of listing_various_functions
+LANG_DIRS = ['assets/minecraft/lang/', 'assets/lang/']
+listing_various_access: dict[Callable[[str, ListingContext], None], tuple[list[str], list[str]]] = {
+    listing_builtit_datapacks: (['data/minecraft/datapacks/'], ['lists/datapacks.txt']),
+    listing_structures: (['data/', 'assets/minecraft/structures/'], ['lists/structure.nbt.txt', 'lists/structures.nbt.txt']),
+    listing_advancements: (['data/', 'assets/minecraft/advancements/', *LANG_DIRS], ['lists/advancement.', 'lists/advancements.']),
+    listing_subdir_reports: (['reports/'], ['lists/'+ x +'.txt' for x in ['dimension', 'dimension_type', 'biome_parameters', 'chat_type', 'components']]),
+    listing_special_subdirs: (['data/'], ['lists/']),
+    listing_loot_tables: (['data/', 'assets/minecraft/loot_tables/'], ['lists/loot_table.', 'lists/loot_tables.', 'lists/loot_tables/']),
+    listing_worldgens: (['data/', 'reports/'], ['lists/dimension.txt', 'lists/worldgen/']),
+    listing_blocks: (['reports/blocks.json'], ['lists/block.txt', 'lists/blocks/']),
+    listing_items: (['reports/items.json', *LANG_DIRS], ['lists/item.txt', 'lists/items/']),
+    listing_packets: (['reports/packets.json'], ['lists/packets/']),
+    listing_datapacks: (['reports/datapack.json'], ['lists/datapacks/']),
+    listing_paintings: (['data/', *LANG_DIRS], ['lists/paintings/']),
+    listing_jukebox_songs: (['data/', *LANG_DIRS], ['lists/jukebox_songs/', 'lists/jukebox_songs.names.txt']),
+    listing_instruments: (['data/', *LANG_DIRS], ['lists/instruments/', 'lists/instruments.names.txt']),
+    listing_commands: (['reports/commands.json'], ['lists/commands/', 'lists/command_argument_type.txt']),
+    listing_registries: (['reports/registries.json', 'data/'], ['lists/']),
+    listing_components: (['data/minecraft/components/', 'reports/minecraft/components/', *LANG_DIRS], ['lists/components.txt', 'lists/components/']),
+    listing_tags: (['data/'], ['lists/tags/']),
+    # listing_languages consume pack.mcmeta, it is never read by the listings of the whole assets/
+    listing_sounds: (['assets/', '!assets/pack.mcmeta'], ['lists/sounds/', 'lists/sounds.ogg.txt']),
+    listing_musics: (['assets.json', 'assets/minecraft/sounds.json', *LANG_DIRS], ['lists/musics/', 'lists/musics.names.txt']),
+    listing_languages: (['assets/lang/', 'assets/pack.mcmeta'], ['lists/languages.json', 'assets/pack.mcmeta']),
+    listing_assets: (['assets/', '!assets/pack.mcmeta'], ['lists/']),
+    listing_rpc_api_schema: (['reports/json-rpc-api-schema.json'], ['lists/json-rpc-api-schema/']),
+    listing_timelines: (['data/minecraft/timeline/'], ['lists/timelines/']),
+    listing_villager_trade: (['data/minecraft/villager_trade/'], ['lists/villager_trade/']),
+}
+
+def listing_access(func: Callable[[str, ListingContext], None]) -> tuple[list[str], list[str]]:
+    # a function without declaration is considered to access everything
+    return listing_various_access.get(func, ([''], ['']))
+
+def _listing_modify_tree(func: Callable[[str, ListingContext], None]) -> bool:
+    return any(not w.startswith('lists/') for w in listing_access(func)[1])
+
+def _split_access(paths) -> tuple[list[str], list[str]]:
+    return [p for p in paths if not p.startswith('!')], [p[1:] for p in paths if p.startswith('!')]
+
+def _path_accessed(path, paths) -> bool:
+    included, excluded = _split_access(paths)
+    return any(path.startswith(p) for p in included) and not any(path.startswith(e) for e in excluded)
+
+def _paths_overlap(paths_a, paths_b) -> bool:
+    included_a, excluded_a = _split_access(paths_a)
+    included_b, excluded_b = _split_access(paths_b)
+    for a in included_a:
+        for b in included_b:
+            # the inner path of the two must not be in the excluded part of the outer one
+            if b.startswith(a) and not any(b.startswith(e) for e in excluded_a):
+                return True
+            if a.startswith(b) and not any(a.startswith(e) for e in excluded_b):
+                return True
+    return False
+
+def listing_dependencies(funcs: list[Callable[[str, ListingContext], None]]) -> dict[Callable[[str, ListingContext], None], set[Callable[[str, ListingContext], None]]]:
+    def conflict(func_a, func_b):
+        reads_a, writes_a = listing_access(func_a)
+        reads_b, writes_b = listing_access(func_b)
+        return _paths_overlap(writes_a, reads_b + writes_b) or _paths_overlap(reads_a, writes_b)
+    
+    return {f:set(prev for prev in funcs[:idx] if conflict(prev, f)) for idx,f in enumerate(funcs)}
+
+_listing_worker_context: ListingContext = None
+
+def _listing_worker_init(temp, index, compare):
+    from common import WRITE_STATS
+    
+    # each process of the pool keep its own context for all the functions it run
+    global _listing_worker_context
+    _listing_worker_context = ListingContext(temp, index)
+    WRITE_STATS.compare = compare
+
+def _listing_run(func, ctx: ListingContext) -> set[str]:
+    import time
+    from common import STAGE_STATS, OutputSink, record_writes
+    
+    start, cpu = time.perf_counter(), time.process_time()
+    with record_writes() as written, OutputSink():
+        func(ctx.temp, ctx)
+    STAGE_STATS.listing(func.__name__, time.perf_counter() - start, time.process_time() - cpu, len(written))
+    return written
+
+def _listing_worker_run(func) -> tuple[set[str], int, int, int, dict]:
+    from common import STAGE_STATS, WRITE_STATS
+    
+    # the counts and timings of the process are returned to the main one
+    written, skipped, bytes = WRITE_STATS.written, WRITE_STATS.skipped, WRITE_STATS.bytes
+    rslt = _listing_run(func, _listing_worker_context)
+    timing = STAGE_STATS.listings.pop(func.__name__)
+    return rslt, WRITE_STATS.written - written, WRITE_STATS.skipped - skipped, WRITE_STATS.bytes - bytes, timing
+
+def _listing_run_all(temp, index: TreeIndex, funcs, jobs) -> dict[Callable[[str, ListingContext], None], set[str]]:
+    """Run the listing functions, and return the files written by each of them"""
+    funcs = list(funcs)
+    written = {}
+    
+    if not jobs or jobs <= 1:
+        ctx = ListingContext(temp, index)
+        for func in funcs:
+            written[func] = _listing_run(func, ctx)
+        return written
+    
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from common import STAGE_STATS, WRITE_STATS
+    
+    dependencies = listing_dependencies(funcs)
+    running = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_listing_worker_init, initargs=(temp, index, WRITE_STATS.compare)) as executor:
+        while funcs or running:
+            for func in list(funcs):
+                if dependencies[func].issubset(written):
+                    funcs.remove(func)
+                    running[executor.submit(_listing_worker_run, func)] = func
+            
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                func = running.pop(future)
+                written[func], count_written, count_skipped, count_bytes, STAGE_STATS.listings[func.__name__] = future.result()
+                WRITE_STATS.add(count_written, count_skipped, count_bytes)
+    
+    return written
+
+def listing_manifest_path(temp) -> str:
+    import hashlib
+    key = hashlib.sha1(os.path.normcase(os.path.abspath(temp)).encode('utf-8')).hexdigest()
+    return os.path.join(TEMP_DIR, 'cache', 'listing_manifest', key+'.json')
+
+def listing_copy_forward(temp, base, base_temp) -> int:
+    """
+    Seed the incremental manifest of temp with the one of a base version build,
+    and copy the /lists/ files of the base output: only the listing functions
+    that have different inputs than the base version will be run again.
+    """
+    manifest_path = listing_manifest_path(temp)
+    base_manifest = read_json(listing_manifest_path(base_temp))
+    # without /lists/, the manifest of temp is the one of a previous build moved away
+    if not base_manifest or (os.path.exists(manifest_path) and os.path.isdir(os.path.join(temp, 'lists'))):
+        return 0
+    
+    count = 0
+    for entry in base_manifest.get('functions', {}).values():
+        for f in entry['outputs']:
+            base_file = os.path.join(base, f)
+            if os.path.isfile(base_file):
+                materialize_file(base_file, os.path.join(temp, f))
+                count += 1
+    write_json(manifest_path, base_manifest, sort_keys=True)
+    return count
+
+def _listing_code_hash() -> str:
+    # any edit of the code invalidate the previous outputs
+    import common
+    from common import hash_file
+    return ''.join(hash_file(f) for f in (__file__, common.__file__))
+
+def listing_inputs_hashes(temp, index: TreeIndex, funcs) -> dict[Callable[[str, ListingContext], None], str]:
+    """
+    Hash of the inputs of each listing function: the content of all the files under the paths it reads.
+    """
+    import hashlib
+    from common import hash_file_indexed
+    
+    files = []
+    for f in index.iglob(temp):
+        files.append(f.replace(os.path.sep, '/'))
+    files.sort()
+    
+    files_hash = {}
+    rslt = {}
+    for func in funcs:
+        reads, _writes = listing_access(func)
+        h = hashlib.sha1()
+        for f in files:
+            if _path_accessed(f, reads):
+                if f not in files_hash:
+                    files_hash[f] = hash_file_indexed(os.path.join(temp, f))
+                h.update(f.encode('utf-8') +b'\0'+ files_hash[f].encode('ascii') +b'\n')
+        rslt[func] = h.hexdigest()
+    return rslt
+
+def listing_various_data(temp, jobs=1, funcs=None, manifest_path=None):
+    """
+    Generate the /lists/ folder.
+    
+    With a manifest_path, the build is incremental: the manifest record the hash of the inputs
+    and of the outputs of each function, and the functions with the same inputs and intact outputs are skipped.
+    """
+    from common import hash_file_indexed
+    
+    funcs = list(funcs or listing_various_functions)
+    index = listing_index(temp)
+    
+    if not manifest_path:
+        _listing_run_all(temp, index, funcs, jobs)
+        return
+    
+    code_hash = _listing_code_hash()
+    inputs_hashes = listing_inputs_hashes(temp, index, funcs)
+    manifest = read_json(manifest_path)
+    if manifest.get('code') != code_hash:
+        manifest = {}
+    entries = manifest.get('functions', {})
+    
+    def rel_path(path):
+        return os.path.relpath(path, temp).replace(os.path.sep, '/')
+    
+    run = []
+    for func in funcs:
+        entry = entries.get(func.__name__)
+        outdated = (
+            not entry
+            or entry['inputs'] != inputs_hashes[func]
+            or not all(hash_test(h, os.path.join(temp, f)) for f,h in entry['outputs'].items())
+        )
+        reads, _writes = listing_access(func)
+        # a function that modify the tree outside of /lists/ is always run
+        if _listing_modify_tree(func):
+            outdated = True
+        # a function that read the writes of a function to run must be run after it
+        if not outdated and any(_paths_overlap(listing_access(f)[1], reads) for f in run):
+            outdated = True
+        if outdated:
+            run.append(func)
+    
+    # the previous outputs of the functions to run can be obsolete
+    # (except for the ones that modify the tree, they may have consumed their inputs)
+    kept = set(f for func in funcs if func not in run and func.__name__ in entries for f in entries[func.__name__]['outputs'])
+    for func in run:
+        if _listing_modify_tree(func):
+            continue
+        for f in entries.get(func.__name__, {}).get('outputs', {}):
+            if f not in kept:
+                safe_del(os.path.join(temp, f))
+    
+    written = _listing_run_all(temp, index, run, jobs)
+    
+    # a function that is run can overwrite the outputs of a following function that was skipped
+    while True:
+        order = {f:idx for idx,f in enumerate(funcs)}
+        rerun = []
+        for func in funcs:
+            if func in written:
+                continue
+            outputs = set(entries[func.__name__]['outputs'])
+            if any(order[f] < order[func] and outputs.intersection(rel_path(p) for p in w) for f,w in written.items()):
+                rerun.append(func)
+        if not rerun:
+            break
+        written.update(_listing_run_all(temp, index, rerun, 1))
+    
+    for func in funcs:
+        if func in written:
+            outputs = sorted(set(rel_path(p) for p in written[func]))
+        else:
+            outputs = entries[func.__name__]['outputs']
+        entries[func.__name__] = {
+            'inputs': inputs_hashes[func],
+            'outputs': {f:h for f in outputs if (h := hash_file_indexed(os.path.join(temp, f)))},
+        }
+    write_json(manifest_path, {'code': code_hash, 'functions': entries}, sort_keys=True)
+
+def listing_various_data_alt(version, temp, jobs=1, incremental=True):
     # internal function
     # private use for Github update script
     
@@ -2455,11 +3286,13 @@ def listing_various_data_alt(version, temp):
     for path in rewrite_files:
         if os.path.exists(path) and os.path.isfile(path):
             write_text(path, read_text(path))
+            # the compare mode can skip the write, the time must be updated anyway
+            os.utime(path)
     
-    for func in listing_various_functions:
-        if func in exclude_funcs:
-            continue
-        func(temp)
+    listing_various_data(
+        temp, jobs, [f for f in listing_various_functions if f not in exclude_funcs],
+        manifest_path=listing_manifest_path(temp) if incremental else None,
+    )
 
 
 if __name__ == "__main__":
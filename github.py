@@ -11,8 +11,8 @@ class GitHub:
     
     def get_json(self, url):
         import json
-        from urllib import request
-        with request.urlopen(url) as fl:
+        from common import urlopen
+        with urlopen(url) as fl:
             return json.load(fl)
     
     def releases(self, tag=None):
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+
+
+import argparse
+import os.path
+import statistics
+import subprocess
+import sys
+
+VERSION = (0, 1, 0)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# modules loaded by each CLI until it start to work
+# the scripts that parse the command line at import are run with --help
+CLI = [
+    'common',
+    'generated_data_builder',
+    'assets_unidexer',
+    'datapack_to_mod',
+    'datapacks-seeder',
+    'MinecraftWiki_data_generator',
+]
+
+_IMPORT_CODE = '''
+import importlib.util, sys, time
+name, path = sys.argv[1], sys.argv[2]
+sys.argv = [path, '--help']
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location(name.replace('-', '_'), path)
+module = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = module
+try:
+    spec.loader.exec_module(module)
+except SystemExit:
+    pass
+print(time.perf_counter() - start, file=sys.stderr)
+'''
+
+# files opened by the import of common other than the Python modules
+_AUDIT_CODE = '''
+import sys
+opened = []
+def hook(event, args):
+    if event == 'open' and isinstance(args[0], str) and not args[0].endswith(('.py', '.pyc', '.so')):
+        opened.append(args[0])
+    if event in ('socket.connect', 'urllib.Request'):
+        opened.append(repr(args[0]))
+sys.addaudithook(hook)
+import common
+print('\\n'.join(opened))
+'''
+
+def import_time(name, repeat=5) -> list[float]:
+    """
+    Time in seconds to import the CLI in a fresh interpreter, for each run.
+    """
+    path = os.path.join(ROOT, name+'.py')
+    rslt = []
+    for _ in range(repeat):
+        p = subprocess.run([sys.executable, '-c', _IMPORT_CODE, name, path], cwd=ROOT, capture_output=True, text=True)
+        if p.returncode:
+            raise RuntimeError(f'Import of {name} failed:\n{p.stderr}')
+        rslt.append(float(p.stderr.strip().splitlines()[-1]))
+    return rslt
+
+def common_io() -> list[str]:
+    """
+    The files and connections opened when common is imported.
+    """
+    p = subprocess.run([sys.executable, '-c', _AUDIT_CODE], cwd=ROOT, capture_output=True, text=True)
+    if p.returncode:
+        raise RuntimeError(f'Import of common failed:\n{p.stderr}')
+    return [l for l in p.stdout.splitlines() if l]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure the cold-start import time of each CLI.')
+    parser.add_argument('cli', nargs='*', help='CLI to measure (default all): '+', '.join(CLI))
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Number of fresh interpreter per CLI')
+    parser.add_argument('--max-ms', type=float, help='Fail if the median import time of a CLI is over this limit')
+    args = parser.parse_args()
+    for name in args.cli:
+        if name not in CLI:
+            parser.error(f'unknown CLI: {name}')
+
+    failed = False
+
+    opened = common_io()
+    if opened:
+        failed = True
+        print('Importing common does I/O:')
+        for o in opened:
+            print(' ', o)
+
+    for name in args.cli or CLI:
+        median = statistics.median(import_time(name, args.repeat)) * 1000
+        over = args.max_ms is not None and median > args.max_ms
+        failed = failed or over
+        print(f'{name:<30} {median:8.1f} ms' + (' > '+str(args.max_ms) if over else ''))
+
+    sys.exit(1 if failed else 0)
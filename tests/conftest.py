@@ -0,0 +1,94 @@
+import http.server
+import os
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class LocalServer():
+    """
+    Local HTTP stand-in: serve the bytes of routes, with ETag validation
+    and Range requests, and count the requests received by path.
+    ranges:     Range requests are honoured, else the full body is sent with 200
+    bad_start:  a Range request get this range start instead of the requested one
+    drop:       number of next responses truncated by a closed connection
+    """
+
+    def __init__(self):
+        self.routes: dict[str, bytes] = {}
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        self.ranges = True
+        self.bad_start: int|None = None
+        self.drop = 0
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                if self.path not in server.routes:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = server.routes[self.path]
+                etag = '"'+ str(hash(body)) +'"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                start = 0
+                if self.headers.get('Range') and server.ranges:
+                    start = int(self.headers['Range'].split('=')[1].split('-')[0])
+                    if start >= len(body):
+                        self.send_response(416)
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    if server.bad_start is not None:
+                        start = server.bad_start
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{len(body)-1}/{len(body)}')
+                else:
+                    self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body) - start))
+                self.end_headers()
+                if server.drop:
+                    server.drop -= 1
+                    self.wfile.write(body[start:start + (len(body) - start)//3])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    return
+                self.wfile.write(body[start:])
+
+        self.handler = Handler
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def count(self, path) -> int:
+        return sum(1 for p, _ in self.requests if p == path)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # the local server is never behind a proxy of the environment
+    monkeypatch.setenv('no_proxy', '127.0.0.1')
+    s = LocalServer()
+    yield s
+    s.close()
@@ -0,0 +1,81 @@
+import hashlib
+import os
+
+import pytest
+
+import common
+
+DATA = os.urandom(300_000)
+SHA1 = hashlib.sha1(DATA).hexdigest()
+
+
+@pytest.fixture
+def dl(server, tmp_path, monkeypatch):
+    server.routes['/file.bin'] = DATA
+    monkeypatch.setattr(common, 'HASH_INDEX', common.HashIndex(str(tmp_path / 'hash_index.json')))
+    return server, server.url+'/file.bin', str(tmp_path / 'file.bin')
+
+
+def ranges(server) -> list[str|None]:
+    return [h.get('Range') for _, h in server.requests]
+
+
+def read(path) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def write_part(file, size):
+    with open(file+'.part', 'wb') as f:
+        f.write(DATA[:size])
+
+
+def test_download(dl):
+    server, url, file = dl
+    assert common.download_file(url, file, SHA1) == SHA1
+    assert read(file) == DATA
+    assert not os.path.exists(file+'.part')
+    assert common.HASH_INDEX.lookup(file) == SHA1
+
+
+def test_resume(dl):
+    server, url, file = dl
+    write_part(file, 100_000)
+    common.download_file(url, file, SHA1)
+    assert read(file) == DATA
+    assert ranges(server) == ['bytes=100000-']
+
+
+def test_range_ignored(dl):
+    server, url, file = dl
+    server.ranges = False
+    write_part(file, 100_000)
+    common.download_file(url, file, SHA1)
+    assert read(file) == DATA
+    assert ranges(server) == ['bytes=100000-']
+
+
+def test_truncated_body(dl):
+    server, url, file = dl
+    server.drop = 2
+    common.download_file(url, file, SHA1)
+    assert read(file) == DATA
+    assert ranges(server) == [None, 'bytes=100000-', 'bytes=166666-']
+
+
+def test_unexpected_content_range(dl):
+    server, url, file = dl
+    server.bad_start = 1
+    write_part(file, 100_000)
+    common.download_file(url, file, SHA1)
+    assert read(file) == DATA
+    # the misplaced range is not written, the download restart from the beginning
+    assert ranges(server) == ['bytes=100000-', None]
+
+
+def test_corrupted(dl):
+    server, url, file = dl
+    with pytest.raises(OSError):
+        common.download_file(url, file, '0'*40)
+    assert not os.path.exists(file)
+    assert not os.path.exists(file+'.part')
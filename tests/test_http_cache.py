@@ -0,0 +1,89 @@
+import json
+import os
+
+import pytest
+
+import common
+
+MOJANG = {
+    'latest': {'release': '1.21', 'snapshot': '24w01a'},
+    'versions': [
+        {'id': '24w01a', 'type': 'snapshot', 'releaseTime': '2024-01-03T00:00:00+00:00', 'sha1': '0'*40, 'complianceLevel': 1},
+        {'id': '1.21', 'type': 'release', 'releaseTime': '2024-01-01T00:00:00+00:00', 'sha1': '1'*40, 'complianceLevel': 1},
+    ],
+}
+GITHUB = {
+    'latest': {'release': '1.21', 'snapshot': '24w01a'},
+    'versions': [],
+    'pack_format': {},
+    'versioning': {},
+}
+
+
+@pytest.fixture
+def manifests(server, tmp_path, monkeypatch):
+    """
+    Serve the canned manifests, and run update_version_manifest() in a fresh directory and cache.
+    """
+    server.routes['/mojang.json'] = json.dumps(MOJANG).encode('utf-8')
+    server.routes['/raw/main/version_manifest.json'] = json.dumps(GITHUB).encode('utf-8')
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(common, 'MOJANG_VERSION_MANIFEST_URL', server.url+'/mojang.json')
+    monkeypatch.setattr(common.GITHUB_DATA, 'raw', server.url+'/raw')
+    monkeypatch.setattr(common, 'HTTP_CACHE', common.HTTPCache(str(tmp_path / 'http')))
+    for name in ['VERSION_MANIFEST', 'VERSION_INDEX', 'LATEST_RELEASE', 'LATEST_SNAPSHOT']:
+        monkeypatch.delitem(vars(common), name, raising=False)
+    return server
+
+
+def test_ttl_hit(manifests):
+    common.update_version_manifest()
+    assert manifests.count('/mojang.json') == 1
+    assert common.LATEST_SNAPSHOT == '24w01a'
+    assert common.VERSION_MANIFEST['versions_history'] == ['24w01a', '1.21']
+
+    common.update_version_manifest()
+    assert manifests.count('/mojang.json') == 1
+
+
+def test_expired(manifests):
+    common.update_version_manifest()
+    common.HTTP_CACHE.ttl = 0
+
+    common.update_version_manifest()
+    assert manifests.count('/mojang.json') == 2
+    _, headers = manifests.requests[-1]
+    assert headers.get('If-None-Match')
+
+    manifests.routes['/mojang.json'] = json.dumps({
+        'latest': {'release': '1.21', 'snapshot': '24w02a'},
+        'versions': [{'id': '24w02a', 'type': 'snapshot', 'releaseTime': '2024-01-10T00:00:00+00:00'}] + MOJANG['versions'],
+    }).encode('utf-8')
+    common.update_version_manifest()
+    assert manifests.count('/mojang.json') == 3
+    assert common.LATEST_SNAPSHOT == '24w02a'
+    assert common.VERSION_MANIFEST['versions_history'][0] == '24w02a'
+
+
+def test_offline(manifests):
+    common.update_version_manifest()
+    common.HTTP_CACHE.ttl = 0
+    common.HTTP_CACHE.offline = True
+    manifests.routes.clear()
+
+    common.update_version_manifest()
+    assert manifests.count('/mojang.json') == 1
+    assert common.LATEST_SNAPSHOT == '24w01a'
+
+
+def test_offline_empty_cache(manifests):
+    common.HTTP_CACHE.offline = True
+
+    with pytest.raises(OSError):
+        common.HTTP_CACHE.get(manifests.url+'/mojang.json')
+
+    common.update_version_manifest()
+    assert not manifests.requests
+    assert os.path.exists('version_manifest.json')
+    assert common.LATEST_RELEASE is None
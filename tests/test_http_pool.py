@@ -0,0 +1,93 @@
+import base64
+import http.server
+import threading
+
+import pytest
+
+import common
+
+
+class Proxy():
+    """
+    Proxy stand-in: answer any GET with the url it received, and refuse CONNECT.
+    """
+
+    def __init__(self):
+        self.requests: list[tuple[str, str, dict[str, str]]] = []
+        proxy = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                proxy.requests.append(('GET', self.path, dict(self.headers)))
+                body = self.path.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_CONNECT(self):
+                proxy.requests.append(('CONNECT', self.path, dict(self.headers)))
+                self.send_response(502)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.address = f'127.0.0.1:{self.httpd.server_port}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def proxy(monkeypatch):
+    p = Proxy()
+    for name in ['no_proxy', 'NO_PROXY', 'http_proxy', 'HTTP_PROXY', 'https_proxy', 'HTTPS_PROXY', 'all_proxy', 'ALL_PROXY']:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv('http_proxy', f'http://user:p%40ss@{p.address}')
+    monkeypatch.setenv('https_proxy', p.address)
+    yield p
+    p.close()
+
+
+def test_http_proxy(proxy):
+    pool = common.HTTPPool()
+    with pool.request('http://example.invalid/file.json?a=1') as response:
+        assert response.read() == b'http://example.invalid/file.json?a=1'
+    method, path, headers = proxy.requests[0]
+    assert method == 'GET'
+    assert headers['Proxy-Authorization'] == 'Basic ' + base64.b64encode(b'user:p@ss').decode('ascii')
+    pool.close()
+
+
+def test_https_tunnel(proxy):
+    pool = common.HTTPPool()
+    with pytest.raises(OSError):
+        pool.request('https://example.invalid/file.json')
+    assert proxy.requests[0][:2] == ('CONNECT', 'example.invalid:443')
+    pool.close()
+
+
+def test_no_proxy(proxy, server, monkeypatch):
+    monkeypatch.setenv('no_proxy', 'localhost,127.0.0.1')
+    server.routes['/file.json'] = b'{}'
+    pool = common.HTTPPool()
+    with pool.request(server.url+'/file.json') as response:
+        assert response.read() == b'{}'
+    assert not proxy.requests
+    pool.close()
+
+
+def test_urlretrieve_data(tmp_path, monkeypatch):
+    # a POST keep the urllib signature
+    calls = []
+    monkeypatch.setattr('urllib.request.urlretrieve', lambda *args: calls.append(args) or (args[1], None))
+    file = str(tmp_path / 'out')
+    common.urlretrieve('https://example.invalid/post', file, None, b'data')
+    assert calls == [('https://example.invalid/post', file, None, b'data')]
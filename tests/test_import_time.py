@@ -0,0 +1,14 @@
+import subprocess
+import sys
+
+import import_time
+
+
+def test_common_import_does_no_io():
+    assert import_time.common_io() == []
+
+
+def test_import_time():
+    # generous limit: catch a CLI that starts to load heavy modules or do I/O at import, not the noise
+    p = subprocess.run([sys.executable, 'import_time.py', '-r', '3', '--max-ms', '500'], cwd=import_time.ROOT, capture_output=True, text=True)
+    assert p.returncode == 0, p.stdout + p.stderr
@@ -0,0 +1,73 @@
+import os
+import zipfile
+
+import pytest
+
+import common
+
+TEXT = b''.join(b'%d: minecraft:block/stone_%d\n' % (i, i % 97) for i in range(20_000))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'tree'
+    (root / 'lists' / 'empty').mkdir(parents=True)
+    (root / 'lists' / 'blocks.txt').write_bytes(TEXT)
+    (root / 'assets').mkdir()
+    (root / 'assets' / 'icon.png').write_bytes(os.urandom(1000))
+    (root / 'assets' / 'empty.json').write_bytes(b'')
+    return root
+
+
+def files(root) -> dict[str, bytes]:
+    rslt = {}
+    for dirpath, _, filenames in os.walk(root):
+        for f in filenames:
+            path = os.path.join(dirpath, f)
+            with open(path, 'rb') as fp:
+                rslt[os.path.relpath(path, root).replace(os.path.sep, '/')] = fp.read()
+    return rslt
+
+
+@pytest.mark.parametrize('method', common.ZIP_METHODS)
+@pytest.mark.parametrize('level', ['default', 'min', 'max'])
+def test_read_back(tree, tmp_path, method, level):
+    levels = common.ZIP_LEVELS[method]
+    if levels is None and level != 'default':
+        pytest.skip('no compression level')
+    level = {'default': None, 'min': levels and levels[0], 'max': levels and levels[1]}[level]
+
+    path = str(tmp_path / 'out.zip')
+    assert common.make_zip(path, str(tree), method, level, workers=2) == (3, len(TEXT) + 1000)
+    with zipfile.ZipFile(path) as zip:
+        assert zip.testzip() is None
+        assert 'lists/empty/' in zip.namelist()
+        assert {n: zip.read(n) for n in zip.namelist() if not n.endswith('/')} == files(tree)
+        assert zip.getinfo('assets/icon.png').compress_type == zipfile.ZIP_STORED
+
+
+def test_reproducible(tree, tmp_path):
+    a, b = str(tmp_path / 'a.zip'), str(tmp_path / 'b.zip')
+    common.make_zip(a, str(tree), workers=1)
+    os.utime(tree / 'lists' / 'blocks.txt', (0, 0))
+    common.make_zip(b, str(tree), workers=4)
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        assert fa.read() == fb.read()
+
+
+def test_lzma_level(tree, tmp_path):
+    sizes = []
+    for level in (0, 9):
+        path = str(tmp_path / f'{level}.zip')
+        common.make_zip(path, str(tree), 'lzma', level)
+        with zipfile.ZipFile(path) as zip:
+            sizes.append(zip.getinfo('lists/blocks.txt').compress_size)
+    assert sizes[0] > sizes[1]
+
+
+@pytest.mark.parametrize('method, level', [('deflate', 12), ('deflate', -1), ('bzip2', 0), ('lzma', 10), ('store', 1)])
+def test_invalid_level(tree, tmp_path, method, level):
+    path = str(tmp_path / 'out.zip')
+    with pytest.raises(ValueError):
+        common.make_zip(path, str(tree), method, level)
+    assert not os.path.exists(path)